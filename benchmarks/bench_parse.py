@@ -0,0 +1,166 @@
+# SPDX-License-Identifier: GPL-2.0+
+"""
+Benchmark suite for module parsing and fFort start up.
+
+Usage:
+    python benchmarks/bench_parse.py [--preset small|medium|large] [-o results.json]
+    python benchmarks/bench_parse.py --procs N --types M --param-size K --depth D
+
+Generates a synthetic module (see generate.py), compiles it with gfortran
+and then, in a fresh interpreter for each measurement, times:
+
+    module_s        building gfort2py.module_parse.module
+    fFort_s         building gfort2py.fFort (includes a fresh parse)
+    first_param_s   first access of a (large) parameter array
+    first_var_s     first access of a module variable
+    first_proc_s    first access of a procedure
+    peak_rss_mb     peak resident memory of the process
+
+for both eager and lazy symbol loading. Results are written as JSON so runs
+can be compared to spot regressions.
+"""
+
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from generate import add_arguments, build
+
+PRESETS = {
+    "small": dict(procs=50, types=5, nvars=50, param_size=100, depth=2),
+    "medium": dict(procs=500, types=50, nvars=500, param_size=10000, depth=5),
+    "large": dict(procs=3000, types=200, nvars=3000, param_size=100000, depth=10),
+}
+
+MODES = ["eager", "lazy"]
+
+
+def _maxrss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return rss / 1024**2
+    return rss / 1024
+
+
+def _time(func):
+    start = time.perf_counter()
+    res = func()
+    return time.perf_counter() - start, res
+
+
+def worker(lib, mod_file, mode, param_size):
+    import gfort2py as gf
+    from gfort2py.module_parse import module
+
+    lazy = mode == "lazy"
+    res = {"mode": mode}
+
+    res["module_s"], _ = _time(lambda: module(mod_file, lazy=lazy))
+    res["fFort_s"], x = _time(lambda: gf.fFort(lib, mod_file, lazy=lazy))
+
+    param = "table_real" if param_size > 0 else "dp"
+    res["first_param_s"], _ = _time(lambda: getattr(x, param))
+    res["first_var_s"], _ = _time(lambda: x.var_0)
+    res["first_proc_s"], _ = _time(lambda: x.sub_0)
+    res["peak_rss_mb"] = _maxrss_mb()
+
+    print(json.dumps(res))
+
+
+def run(lib, mod_file, config, repeat):
+    results = []
+    for mode in MODES:
+        runs = []
+        for _ in range(repeat):
+            out = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--worker",
+                    lib,
+                    mod_file,
+                    mode,
+                    str(config["param_size"]),
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+        # Keep the best of each metric
+        best = {"mode": mode, **config}
+        for key in runs[0]:
+            if key != "mode":
+                best[key] = min(r[key] for r in runs)
+        results.append(best)
+    return results
+
+
+def _gfortran_version():
+    try:
+        out = subprocess.run(
+            ["gfortran", "--version"], capture_output=True, text=True, check=True
+        )
+        return out.stdout.splitlines()[0]
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--preset", choices=PRESETS.keys(), default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", default=None, help="Write JSON here")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.preset is not None:
+        config = dict(PRESETS[args.preset])
+    else:
+        config = dict(
+            procs=args.procs,
+            types=args.types,
+            nvars=args.nvars,
+            param_size=args.param_size,
+            depth=args.depth,
+        )
+
+    try:
+        import gfort2py
+
+        version = getattr(gfort2py, "__version__", None)
+    except ImportError:
+        version = None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lib, mod_file = build(tmp, **config)
+        results = run(lib, mod_file, config, args.repeat)
+
+    doc = {
+        "meta": {
+            "gfort2py": version,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "gfortran": _gfortran_version(),
+        },
+        "results": results,
+    }
+
+    out = json.dumps(doc, indent=2)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            f.write(out)
+    print(out)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker(sys.argv[2], sys.argv[3], sys.argv[4], int(sys.argv[5]))
+    else:
+        main()
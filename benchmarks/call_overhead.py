@@ -0,0 +1,133 @@
+# SPDX-License-Identifier: GPL-2.0+
+"""
+Measure the Python side overhead of calling Fortran procedures.
+
+Usage:
+    python benchmarks/call_overhead.py [-n CALLS] [-o results.json]
+
+Compiles a small module with gfortran and reports calls per second for a
+set of trivial procedures, so the time is dominated by argument binding,
+conversion and result handling rather than the Fortran code itself.
+
+Also compares calling a procedure over the rows of arrays in a python loop
+with the same work done by fProc.batch (reported as rows per second).
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+SOURCE = """
+module call_overhead
+    implicit none
+
+contains
+
+    integer function int_in(x)
+        integer, intent(in) :: x
+        int_in = 2 * x
+    end function int_in
+
+    integer function int_multi(x, y, z)
+        integer, intent(in) :: x, y, z
+        int_multi = x + y + z
+    end function int_multi
+
+    subroutine sub_opt(x, y)
+        integer, intent(in) :: x
+        integer, intent(in), optional :: y
+    end subroutine sub_opt
+
+    subroutine sub_arr(x)
+        integer, dimension(5), intent(inout) :: x
+        x = x + 1
+    end subroutine sub_arr
+
+end module call_overhead
+"""
+
+
+def build(outdir):
+    src = os.path.join(outdir, "call_overhead.f90")
+    lib = os.path.join(outdir, "call_overhead.so")
+    with open(src, "w") as f:
+        f.write(SOURCE)
+    subprocess.run(
+        ["gfortran", "-fPIC", "-shared", "-J", outdir, "-o", lib, src],
+        check=True,
+    )
+    return lib, os.path.join(outdir, "call_overhead.mod")
+
+
+def rate(func, calls):
+    func()  # Warm up
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--calls", type=int, default=20000)
+    parser.add_argument("-o", "--output", help="Write results as JSON")
+    opts = parser.parse_args()
+
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+    import gfort2py as gf
+
+    with tempfile.TemporaryDirectory() as outdir:
+        x = gf.fFort(*build(outdir))
+
+        int_in = x.int_in
+        int_multi = x.int_multi
+        sub_opt = x.sub_opt
+        sub_arr = x.sub_arr
+        arr = np.zeros(5, dtype=np.int32)
+
+        cases = {
+            "int_in(1)": lambda: int_in(1),
+            "int_in(x=1)": lambda: int_in(x=1),
+            "int_multi(1, 2, 3)": lambda: int_multi(1, 2, 3),
+            "sub_opt(1, None)": lambda: sub_opt(1, None),
+            "sub_arr(arr)": lambda: sub_arr(arr),
+            "x.int_in(1)": lambda: x.int_in(1),
+        }
+
+        results = {}
+        for name, func in cases.items():
+            results[name] = rate(func, opts.calls)
+            print(f"{name:<24} {results[name]:>12.0f} calls/s")
+
+        a = np.arange(opts.calls, dtype=np.int32)
+        rows = np.arange(opts.calls * 5, dtype=np.int32).reshape(-1, 5)
+
+        def loop_multi():
+            return np.array([int_multi(i, j, 1).result for i, j in zip(a, a)])
+
+        def loop_arr():
+            return np.array([sub_arr(r).args["x"] for r in rows])
+
+        batches = {
+            "loop int_multi": loop_multi,
+            "batch int_multi": lambda: int_multi.batch(a, a, 1).result,
+            "loop sub_arr": loop_arr,
+            "batch sub_arr": lambda: sub_arr.batch(rows).args["x"],
+        }
+        for name, func in batches.items():
+            results[name] = rate(func, 1) * opts.calls
+            print(f"{name:<24} {results[name]:>12.0f} rows/s")
+
+    if opts.output:
+        with open(opts.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: GPL-2.0+
+"""
+Writes and compiles synthetic Fortran modules for benchmarking.
+
+Usage:
+    python benchmarks/generate.py outdir [--procs N] [--types M] [--vars V]
+                                         [--param-size K] [--depth D]
+"""
+
+import argparse
+import os
+import subprocess
+
+
+def write_module(
+    filename, name="big", procs=100, types=10, nvars=100, param_size=1000, depth=3
+):
+    lines = [
+        f"module {name}",
+        "implicit none",
+        "integer, parameter :: dp = kind(1.d0)",
+        "integer :: j",
+    ]
+
+    # Large parameter arrays
+    if param_size > 0:
+        lines.append(
+            f"real(dp), parameter :: table_real({param_size}) = [(real(j, dp) * 0.5_dp, j=1, {param_size})]"
+        )
+        lines.append(
+            f"integer, parameter :: table_int({param_size}) = [(j, j=1, {param_size})]"
+        )
+
+    # Flat derived types
+    for i in range(types):
+        lines.extend(
+            [
+                f"type dt_{i}",
+                "integer :: a",
+                "real(dp) :: b",
+                "real(dp), dimension(5) :: c",
+                "character(len=10) :: d",
+                "end type",
+            ]
+        )
+
+    # Deeply nested types
+    lines.extend(["type nest_0", "real(dp) :: x", "end type"])
+    for i in range(1, depth + 1):
+        lines.extend(
+            [
+                f"type nest_{i}",
+                f"type(nest_{i-1}) :: inner",
+                "integer, dimension(3) :: y",
+                "end type",
+            ]
+        )
+    lines.append(f"type(nest_{depth}) :: nested")
+
+    for i in range(nvars):
+        if i % 3 == 0:
+            lines.append(f"integer :: var_{i}")
+        elif i % 3 == 1:
+            lines.append(f"real(dp), dimension(5) :: var_{i}")
+        else:
+            lines.append(f"real(dp), allocatable, dimension(:,:) :: var_{i}")
+
+    lines.append("contains")
+    for i in range(procs):
+        lines.extend(
+            [
+                f"subroutine sub_{i}(a, b, c)",
+                "integer, intent(in) :: a",
+                "real(dp), intent(inout) :: b(:)",
+                "real(dp), intent(out), optional :: c",
+                "b = a",
+                f"end subroutine sub_{i}",
+            ]
+        )
+    lines.append(f"end module {name}")
+
+    with open(filename, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def build(outdir, name="big", **kwargs):
+    """
+    Writes and compiles a synthetic module, returns (library, mod file)
+    """
+    os.makedirs(outdir, exist_ok=True)
+    src = os.path.join(outdir, f"{name}.f90")
+    lib = os.path.join(outdir, f"{name}.so")
+    write_module(src, name=name, **kwargs)
+
+    size = max(kwargs.get("param_size", 0), 65535)
+    subprocess.run(
+        [
+            "gfortran",
+            "-fPIC",
+            "-shared",
+            f"-fmax-array-constructor={size}",
+            f"-J{outdir}",
+            "-o",
+            lib,
+            src,
+        ],
+        check=True,
+    )
+    return lib, os.path.join(outdir, f"{name}.mod")
+
+
+def add_arguments(parser):
+    parser.add_argument("--procs", type=int, default=100, help="Number of procedures")
+    parser.add_argument("--types", type=int, default=10, help="Number of derived types")
+    parser.add_argument(
+        "--vars", dest="nvars", type=int, default=100, help="Number of variables"
+    )
+    parser.add_argument(
+        "--param-size", type=int, default=1000, help="Size of parameter arrays"
+    )
+    parser.add_argument(
+        "--depth", type=int, default=3, help="Nesting depth of derived types"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("outdir")
+    add_arguments(parser)
+    args = vars(parser.parse_args())
+    print(*build(args.pop("outdir"), **args))
@@ -0,0 +1,126 @@
+# SPDX-License-Identifier: GPL-2.0+
+"""
+Measure the cost of passing multi-MB arrays with each intent.
+
+Usage:
+    python benchmarks/intent_arrays.py [-n CALLS] [-s SIZE] [-o results.json]
+
+Compiles a small module with gfortran whose procedures do almost no work on
+real(dp) arrays of SIZE elements (default 2**20, 8 MB), so the time is
+dominated by copying the arrays in and out of Fortran. The intent(inout)
+cases show the cost of a full copy in and copy out, which is what every
+array argument used to pay regardless of its intent.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+SOURCE = """
+module intent_arrays
+    implicit none
+
+    integer, parameter :: dp = selected_real_kind(p=15)
+    integer, parameter :: n = {size}
+
+contains
+
+    subroutine exp_in(x)
+        real(dp), dimension(n), intent(in) :: x
+    end subroutine exp_in
+
+    subroutine exp_out(x)
+        real(dp), dimension(n), intent(out) :: x
+        x(1) = 1.0_dp
+    end subroutine exp_out
+
+    subroutine exp_inout(x)
+        real(dp), dimension(n), intent(inout) :: x
+        x(1) = 1.0_dp
+    end subroutine exp_inout
+
+    subroutine shape_in(x)
+        real(dp), dimension(:), intent(in) :: x
+    end subroutine shape_in
+
+    subroutine shape_out(x)
+        real(dp), dimension(:), intent(out) :: x
+        x(1) = 1.0_dp
+    end subroutine shape_out
+
+    subroutine shape_inout(x)
+        real(dp), dimension(:), intent(inout) :: x
+        x(1) = 1.0_dp
+    end subroutine shape_inout
+
+end module intent_arrays
+"""
+
+
+def build(outdir, size):
+    src = os.path.join(outdir, "intent_arrays.f90")
+    lib = os.path.join(outdir, "intent_arrays.so")
+    with open(src, "w") as f:
+        f.write(SOURCE.format(size=size))
+    subprocess.run(
+        ["gfortran", "-fPIC", "-shared", "-J", outdir, "-o", lib, src],
+        check=True,
+    )
+    return lib, os.path.join(outdir, "intent_arrays.mod")
+
+
+def rate(func, calls):
+    func()  # Warm up
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--calls", type=int, default=50)
+    parser.add_argument("-s", "--size", type=int, default=2**20)
+    parser.add_argument("-o", "--output", help="Write results as JSON")
+    opts = parser.parse_args()
+
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+    import gfort2py as gf
+
+    with tempfile.TemporaryDirectory() as outdir:
+        x = gf.fFort(*build(outdir, opts.size))
+        arr = np.zeros(opts.size)
+        mb = arr.nbytes / 2**20
+
+        # Reading the argument back is included, that is where copy out happens
+        cases = {
+            "exp_in(arr)": lambda: x.exp_in(arr).args["x"],
+            "exp_out()": lambda: x.exp_out().args["x"],
+            "exp_out(arr)": lambda: x.exp_out(arr).args["x"],
+            "exp_inout(arr)": lambda: x.exp_inout(arr).args["x"],
+            "shape_in(arr)": lambda: x.shape_in(arr).args["x"],
+            "shape_out(arr)": lambda: x.shape_out(arr).args["x"],
+            "shape_inout(arr)": lambda: x.shape_inout(arr).args["x"],
+        }
+
+        results = {"size_mb": mb}
+        for name, func in cases.items():
+            results[name] = rate(func, opts.calls)
+            print(
+                f"{name:<20} {results[name]:>10.1f} calls/s"
+                f" {results[name] * mb:>10.0f} MB/s"
+            )
+
+    if opts.output:
+        with open(opts.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
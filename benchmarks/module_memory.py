@@ -0,0 +1,46 @@
+# SPDX-License-Identifier: GPL-2.0+
+"""
+Measure how much memory a loaded module holds on to.
+
+Usage:
+    python benchmarks/module_memory.py [num_symbols]
+
+Writes a synthetic Fortran module with num_symbols variables and
+num_symbols/2 procedures, compiles it with gfortran and reports the
+size of the objects kept alive by gfort2py.module_parse.module.
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from gfort2py.module_parse import module
+
+from generate import build
+
+
+def measure(mod_file, **kwargs):
+    gc.collect()
+    tracemalloc.start()
+    m = module(mod_file, **kwargs)
+    for key in m.keys():
+        m[key]
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, len(m.symbols)
+
+
+def main(n):
+    with tempfile.TemporaryDirectory() as tmp:
+        _, mod_file = build(tmp, procs=n // 2, types=0, nvars=n, param_size=0, depth=0)
+        size, nsym = measure(mod_file)
+
+    print(f"symbols: {nsym}")
+    print(f"retained: {size / 1024**2:.2f} MB ({size / nsym:.0f} bytes per symbol)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
@@ -0,0 +1,103 @@
+# SPDX-License-Identifier: GPL-2.0+
+"""
+Compare the time and peak memory needed to parse .mod files with the
+streaming tokenizer in gfort2py.module_parse against the old pyparsing
+nestedExpr pass.
+
+Usage:
+    python benchmarks/parse_mod.py file1.mod [file2.mod ...]
+
+Each measurement runs in a fresh interpreter so that the peak RSS of one
+parser does not hide the other. pyparsing must be installed.
+"""
+
+import gzip
+import json
+import resource
+import subprocess
+import sys
+import time
+
+MODES = ["pyparsing", "stream"]
+
+
+def parse_pyparsing(filename):
+    from pyparsing import OneOrMore, nestedExpr
+
+    with gzip.open(filename) as f:
+        x = f.read().decode()
+
+    data = x[x.index("\n") + 1 :].replace("\n", " ")
+    return OneOrMore(nestedExpr()).parseString(data)
+
+
+def parse_stream(filename):
+    from gfort2py.module_parse import parse_sexpr
+
+    with gzip.open(filename, "rt", encoding="utf-8") as f:
+        f.readline()
+        return parse_sexpr(f)
+
+
+def _maxrss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return rss / 1024**2
+    return rss / 1024
+
+
+def worker(mode, filename):
+    # Import everything first so we only time the parse
+    import gfort2py.module_parse
+
+    if mode == "pyparsing":
+        import pyparsing
+
+    base = _maxrss_mb()
+    start = time.perf_counter()
+    if mode == "pyparsing":
+        parse_pyparsing(filename)
+    else:
+        parse_stream(filename)
+    end = time.perf_counter()
+
+    print(
+        json.dumps(
+            {
+                "mode": mode,
+                "file": filename,
+                "time_s": end - start,
+                "peak_rss_mb": _maxrss_mb(),
+                "base_rss_mb": base,
+            }
+        )
+    )
+
+
+def run(filename):
+    results = []
+    for mode in MODES:
+        out = subprocess.run(
+            [sys.executable, __file__, "--worker", mode, filename],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def main(files):
+    print(f"{'file':<40} {'mode':<10} {'time (s)':>10} {'peak RSS (MB)':>14}")
+    for filename in files:
+        for r in run(filename):
+            print(
+                f"{r['file']:<40} {r['mode']:<10} {r['time_s']:>10.3f} {r['peak_rss_mb']:>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker(sys.argv[2], sys.argv[3])
+    else:
+        main(sys.argv[1:])
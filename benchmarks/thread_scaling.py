@@ -0,0 +1,90 @@
+# SPDX-License-Identifier: GPL-2.0+
+"""
+Measure how calls to a PURE procedure scale across threads with fProc.map.
+
+Usage:
+    python benchmarks/thread_scaling.py [-n CALLS] [-w 1 2 4 8] [--work N] [-o results.json]
+
+Compiles a small module with gfortran whose procedure does N iterations of
+floating point work per call, then times CALLS calls with fProc.map for
+each number of workers. The Fortran code runs without the GIL so the
+speed up should follow the number of cores until the Python side
+argument handling dominates (make --work smaller to see that limit).
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SOURCE = """
+module thread_scaling
+    implicit none
+
+contains
+
+    pure function work(x, n) result(y)
+        real(8), intent(in) :: x
+        integer, intent(in) :: n
+        real(8) :: y
+        integer :: i
+
+        y = x
+        do i = 1, n
+            y = sin(y) + x
+        end do
+    end function work
+
+end module thread_scaling
+"""
+
+
+def build(outdir):
+    src = os.path.join(outdir, "thread_scaling.f90")
+    lib = os.path.join(outdir, "thread_scaling.so")
+    with open(src, "w") as f:
+        f.write(SOURCE)
+    subprocess.run(
+        ["gfortran", "-O2", "-fPIC", "-shared", "-J", outdir, "-o", lib, src],
+        check=True,
+    )
+    return lib, os.path.join(outdir, "thread_scaling.mod")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--calls", type=int, default=400)
+    parser.add_argument("-w", "--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--work", type=int, default=200000)
+    parser.add_argument("-o", "--output", help="Write results as JSON")
+    opts = parser.parse_args()
+
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+    import gfort2py as gf
+
+    with tempfile.TemporaryDirectory() as outdir:
+        x = gf.fFort(*build(outdir))
+        work = x.work
+        items = [{"x": i / opts.calls, "n": opts.work} for i in range(opts.calls)]
+        work(**items[0])  # Warm up
+
+        results = {"cpus": os.cpu_count(), "calls": opts.calls, "work": opts.work}
+        base = None
+        for workers in opts.workers:
+            start = time.perf_counter()
+            work.map(items, workers=workers)
+            t = time.perf_counter() - start
+            base = base or t
+            results[workers] = {"seconds": t, "speedup": base / t}
+            print(f"workers={workers:<4} {t:8.3f}s  speed up {base / t:5.2f}x")
+
+    if opts.output:
+        with open(opts.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
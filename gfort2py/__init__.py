@@ -1,3 +1,6 @@
 # SPDX-License-Identifier: GPL-2.0+
-from .gfort2py import fFort, mod_info
+from .gfort2py import fFort, fProject, mod_info
+from .actor import Actor
+from .capture import capture_stdout
+from .executor import fPool
 from .version import __version__
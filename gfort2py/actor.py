@@ -0,0 +1,46 @@
+# SPDX-License-Identifier: GPL-2.0+
+import concurrent.futures
+import threading
+
+
+class Actor:
+    """
+    Runs Fortran calls one at a time on a single dedicated thread.
+
+    For libraries that are not re-entrant: every procedure of an fFort (or
+    of every module of an fProject) created with actor=True is called on
+    the same thread, whichever thread or coroutine made the call. Only the
+    Fortran call itself is sent to the thread, converting the arguments
+    and results is done by the caller.
+    """
+
+    def __init__(self, name="gfort2py"):
+        self._ident = None
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=name, initializer=self._started
+        )
+
+    def _started(self):
+        self._ident = threading.get_ident()
+
+    @property
+    def executor(self):
+        return self._pool
+
+    def on_thread(self):
+        return threading.get_ident() == self._ident
+
+    def submit(self, func, *args):
+        return self._pool.submit(func, *args)
+
+    def run(self, func, *args):
+        """
+        Call func on the actor thread and wait for the result
+        """
+        if self.on_thread():
+            # Already there (a callback into python), waiting would deadlock
+            return func(*args)
+        return self._pool.submit(func, *args).result()
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
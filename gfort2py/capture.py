@@ -0,0 +1,163 @@
+# SPDX-License-Identifier: GPL-2.0+
+import ctypes
+import ctypes.util
+import logging
+import os
+import sys
+import threading
+
+_libgfortran = None
+
+try:
+    _libc = ctypes.CDLL(None)
+except (OSError, TypeError):
+    _libc = None
+
+
+def _flush():
+    """
+    Push out anything Fortran or C has buffered for stdout
+    """
+    global _libgfortran
+
+    if sys.stdout is not None:
+        sys.stdout.flush()
+
+    if _libgfortran is None:
+        name = ctypes.util.find_library("gfortran")
+        try:
+            _libgfortran = ctypes.CDLL(name) if name else False
+        except OSError:
+            _libgfortran = False
+
+    if _libgfortran:
+        # Same as call flush() with no unit, flushes every unit
+        _libgfortran._gfortran_flush_i4(None)
+
+    if _libc is not None:
+        _libc.fflush(None)
+
+
+class StdoutCapture:
+    """
+    Redirects stdout (file descriptor 1, which is where Fortran writes to) into
+    a pipe that is drained on a background thread while the capture is active.
+    Each line is passed to target as a str without the trailing new line.
+
+    target can be a callable, a logging.Logger (lines are logged at level)
+    or a file like object with a write method.
+
+    At most chunk_size bytes are read from the pipe at a time and a line longer
+    than max_line bytes is passed on in pieces, so memory use is bounded no
+    matter how much is written. A slow target slows down the Fortran code
+    rather than buffering output.
+
+    The redirect applies to the whole process, so anything else written to
+    stdout while active (including from python) is also captured.
+    """
+
+    def __init__(
+        self,
+        target,
+        level=logging.INFO,
+        chunk_size=65536,
+        max_line=65536,
+        encoding="utf-8",
+    ):
+        if isinstance(target, logging.Logger):
+            logger = target
+            self._emit = lambda line: logger.log(level, line)
+        elif hasattr(target, "write"):
+            self._emit = lambda line: target.write(line + "\n")
+        elif callable(target):
+            self._emit = target
+        else:
+            raise TypeError(f"Can not send output to {target}")
+
+        self.chunk_size = chunk_size
+        self.max_line = max_line
+        self.encoding = encoding
+        self._thread = None
+        self._error = None
+
+    def _line(self, line):
+        for i in range(0, max(len(line), 1), self.max_line):
+            piece = line[i : i + self.max_line]
+            try:
+                self._emit(piece.decode(self.encoding, errors="replace"))
+            except Exception as e:
+                # Keep draining the pipe, otherwise the Fortran side can block
+                if self._error is None:
+                    self._error = e
+
+    def _drain(self, pipe_out):
+        buf = b""
+        while True:
+            data = os.read(pipe_out, self.chunk_size)
+            if not data:
+                break
+
+            buf += data
+            *lines, buf = buf.split(b"\n")
+            for line in lines:
+                self._line(line)
+
+            if len(buf) > self.max_line:
+                cut = len(buf) - len(buf) % self.max_line
+                self._line(buf[:cut])
+                buf = buf[cut:]
+
+        if buf:
+            self._line(buf)
+
+    def start(self):
+        if self._thread is not None:
+            raise ValueError("Capture already started")
+
+        _flush()
+        self._error = None
+        self._pipe_out, pipe_in = os.pipe()
+        self._stdout = os.dup(1)
+        os.dup2(pipe_in, 1)
+        os.close(pipe_in)
+
+        self._thread = threading.Thread(
+            target=self._drain, args=(self._pipe_out,), daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+
+        _flush()
+        # Restoring stdout closes the last write end of the pipe, the thread
+        # then sees end of file once everything has been read
+        os.dup2(self._stdout, 1)
+        os.close(self._stdout)
+        self._thread.join()
+        os.close(self._pipe_out)
+        self._thread = None
+
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args, **kwargs):
+        self.stop()
+
+
+def capture_stdout(target, **kwargs):
+    """
+    Stream everything written to stdout to target while active:
+
+        with gf.capture_stdout(logger):
+            x.solver()
+
+    See StdoutCapture for the arguments
+    """
+    return StdoutCapture(target, **kwargs)
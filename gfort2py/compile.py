@@ -0,0 +1,197 @@
+# SPDX-License-Identifier: GPL-2.0+
+"""
+Ahead of time binding generator.
+
+    python -m gfort2py.compile lib.so foo.mod [-o outdir] [-n name]
+
+writes outdir/foo_binding.py, a python module that holds the module data
+of foo.mod already parsed (a compressed pickle of the lazily loaded
+module), so importing it never needs the .mod file or the module parser.
+Bindings can only be loaded by the gfort2py version that generated them.
+
+Generated bindings can be imported like any other python module, or via
+install_import_hook(path) which finds bindings in path without it having
+to be on sys.path.
+"""
+
+import argparse
+import ctypes
+import importlib.abc
+import importlib.util
+import os
+import pickle
+import sys
+import types
+import zlib
+
+from .module_parse import module
+from . import version
+
+_MARKER = "# gfort2py binding"
+
+
+def _version():
+    return getattr(version, "__version__", "unknown")
+
+
+def generate(libname, mod_file):
+    """
+    Returns the source code of the binding module for mod_file
+    """
+    # Symbols are only built when first used, so the pickle just holds the
+    # raw symbol data which is quick to load
+    mod = module(mod_file, lazy=True)
+    data = zlib.compress(pickle.dumps(mod, protocol=pickle.HIGHEST_PROTOCOL))
+
+    out = [
+        f"{_MARKER} for {os.path.basename(mod_file)}, do not edit",
+        "from gfort2py.compile import load_binding",
+        "",
+        f"LIBRARY = {libname!r}",
+        f"MOD_FILE = {os.path.basename(mod_file)!r}",
+        f"VERSION = {_version()!r}",
+        "",
+        f"_MODULE = {data!r}",
+        "",
+        "fort = load_binding(__name__, LIBRARY, MOD_FILE, _MODULE, VERSION)",
+        "del _MODULE",
+        "",
+    ]
+    return "\n".join(out)
+
+
+def write(libname, mod_file, outdir=".", name=None):
+    if name is None:
+        # Not just the module name, lib.py next to lib.so would never be
+        # imported as python finds the shared library first
+        name = os.path.splitext(os.path.basename(mod_file))[0] + "_binding"
+
+    filename = os.path.join(outdir, f"{name}.py")
+    src = generate(libname, mod_file)
+    with open(filename, "w") as f:
+        f.write(src)
+    return filename
+
+
+class _BindingModule(types.ModuleType):
+    # Forwards module symbols to the fFort object, so that
+    # foo.x = 1 sets the Fortran variable x
+    def __getattr__(self, key):
+        fort = self.__dict__.get("fort")
+        if fort is not None and key in fort:
+            return getattr(fort, key)
+        raise AttributeError(f"module {self.__name__} has no attribute {key}")
+
+    def __setattr__(self, key, value):
+        fort = self.__dict__.get("fort")
+        if fort is not None and key in fort:
+            setattr(fort, key, value)
+        else:
+            super().__setattr__(key, value)
+
+    def __dir__(self):
+        res = list(self.__dict__.keys())
+        fort = self.__dict__.get("fort")
+        if fort is not None:
+            res.extend(fort.keys())
+        return res
+
+
+def load_binding(module_name, libname, mod_file, data, binding_version):
+    """
+    Called by generated bindings to build their fFort object
+    """
+    from .gfort2py import fFort
+
+    # The module data is pickled gfort2py internals, which change between
+    # versions
+    if binding_version != _version():
+        raise ImportError(
+            f"{module_name} was generated by gfort2py {binding_version} but this is "
+            f"gfort2py {_version()}, regenerate the binding with "
+            "python -m gfort2py.compile",
+            name=module_name,
+        )
+
+    mod = pickle.loads(zlib.decompress(data))
+    mod.filename = mod_file
+    sys.modules[module_name].__class__ = _BindingModule
+    return fFort.from_module(ctypes.CDLL(libname), mod)
+
+
+class BindingFinder(importlib.abc.MetaPathFinder):
+    """
+    Finds generated bindings in a list of directories
+    """
+
+    def __init__(self, paths):
+        self.paths = [os.fspath(i) for i in paths]
+
+    def find_spec(self, fullname, path=None, target=None):
+        if "." in fullname:
+            return None
+
+        # Only look for .py files, a shared library of the same name would
+        # otherwise be found first and fail to import
+        for path in self.paths:
+            filename = os.path.join(path, f"{fullname}.py")
+            try:
+                with open(filename) as f:
+                    if not f.readline().startswith(_MARKER):
+                        continue
+            except OSError:
+                continue
+
+            return importlib.util.spec_from_file_location(fullname, filename)
+
+        return None
+
+
+def install_import_hook(*paths):
+    """
+    Makes generated bindings in paths (or the directories listed in
+    GFORT2PY_BINDINGS) importable. Returns the finder so it can be removed
+    from sys.meta_path again.
+    """
+    if not paths:
+        paths = os.environ.get("GFORT2PY_BINDINGS", "").split(os.pathsep)
+        paths = [i for i in paths if i]
+
+    finder = BindingFinder(paths)
+    sys.meta_path.append(finder)
+    return finder
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m gfort2py.compile",
+        description=(
+            "Generate a python binding module from a shared library and module file"
+        ),
+    )
+    parser.add_argument("library", help="Shared library")
+    parser.add_argument("mod_file", nargs="+", help="Module file(s)")
+    parser.add_argument("-o", "--outdir", default=".", help="Output directory")
+    parser.add_argument(
+        "-n", "--name", default=None, help="Python module name (single mod file only)"
+    )
+    parser.add_argument(
+        "--keep-lib-path",
+        action="store_true",
+        help="Store the library path as given instead of its absolute path",
+    )
+    args = parser.parse_args(argv)
+
+    if args.name is not None and len(args.mod_file) > 1:
+        parser.error("--name can only be used with a single module file")
+
+    libname = args.library
+    if not args.keep_lib_path:
+        libname = os.path.abspath(libname)
+
+    for mod_file in args.mod_file:
+        print(write(libname, mod_file, args.outdir, args.name))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# SPDX-License-Identifier: GPL-2.0+
+import collections
+import ctypes
+import functools
+import threading
+
+# Every ctypes type gfort2py generates whose shape does not depend on the
+# data (array descriptors, complex numbers and derived types) is built once
+# here and shared, rather than a new class being made each time a variable
+# is set up. Fixed size arrays depend on the length of whatever was passed,
+# so only the most recently used ones are kept and they are not counted.
+
+_lock = threading.Lock()
+_types = {}
+_created = collections.Counter()
+
+
+def get(key, make):
+    """
+    The type stored under key, calling make() to build it the first time.
+    key[0] names the kind of type, for counts().
+    """
+    try:
+        return _types[key]
+    except KeyError:
+        pass
+
+    with _lock:
+        if key not in _types:
+            _types[key] = make()
+            _created[key[0]] += 1
+        return _types[key]
+
+
+def array(ctype, size):
+    """
+    ctype * size
+    """
+    return _array(ctype, int(size))
+
+
+@functools.lru_cache(maxsize=256)
+def _array(ctype, size):
+    return ctype * size
+
+
+def complex_type(ctype):
+    """
+    A Fortran complex whose parts are ctype
+    """
+
+    def make():
+        class complex(ctypes.Structure):
+            _fields_ = [
+                ("real", ctype),
+                ("imag", ctype),
+            ]
+
+        return complex
+
+    return get(("complex", ctype), make)
+
+
+def counts():
+    """
+    How many types of each kind have been built so far
+    """
+    with _lock:
+        return dict(_created)
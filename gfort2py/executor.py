@@ -0,0 +1,351 @@
+# SPDX-License-Identifier: GPL-2.0+
+import collections.abc
+import concurrent.futures
+import ctypes
+import multiprocessing
+import os
+import queue
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .module_cache import load_module
+from .fProc import Result
+
+# Arrays at least this many bytes go through shared memory instead of a pipe
+_SHARED_MIN = 1 << 16
+
+
+class _Shared:
+    """
+    Stands in for a numpy array that has been copied into shared memory
+    """
+
+    __slots__ = ("name", "shape", "dtype", "order")
+
+    def __init__(self, name, shape, dtype, order):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+        self.order = order
+
+    def __getstate__(self):
+        return (self.name, self.shape, self.dtype, self.order)
+
+    def __setstate__(self, state):
+        self.name, self.shape, self.dtype, self.order = state
+
+
+def _share(x, shared_min, keep):
+    """
+    Swap large arrays for _Shared, the SharedMemory blocks are added to keep
+    """
+    if isinstance(x, np.ndarray):
+        if x.nbytes < max(shared_min, 1) or x.dtype.hasobject:
+            return x
+        order = "F" if x.flags.f_contiguous and not x.flags.c_contiguous else "C"
+        shm = shared_memory.SharedMemory(create=True, size=x.nbytes)
+        keep.append(shm)
+        np.ndarray(x.shape, x.dtype, buffer=shm.buf, order=order)[...] = x
+        return _Shared(shm.name, x.shape, x.dtype.str, order)
+    elif isinstance(x, Result):
+        return Result(
+            _share(x.result, shared_min, keep), _share(x.args, shared_min, keep)
+        )
+    elif isinstance(x, collections.abc.Mapping):
+        return {k: _share(v, shared_min, keep) for k, v in x.items()}
+    elif isinstance(x, (list, tuple)):
+        return type(x)(_share(v, shared_min, keep) for v in x)
+    return x
+
+
+def _unshare(x, keep, copy=False):
+    """
+    Undo _share, the arrays are views of the shared memory unless copy is set
+    """
+    if isinstance(x, _Shared):
+        shm = shared_memory.SharedMemory(name=x.name)
+        keep.append(shm)
+        arr = np.ndarray(x.shape, x.dtype, buffer=shm.buf, order=x.order)
+        if copy:
+            arr = arr.copy(order="K")
+        return arr
+    elif isinstance(x, Result):
+        return Result(_unshare(x.result, keep, copy), _unshare(x.args, keep, copy))
+    elif isinstance(x, dict):
+        return {k: _unshare(v, keep, copy) for k, v in x.items()}
+    elif isinstance(x, (list, tuple)):
+        return type(x)(_unshare(v, keep, copy) for v in x)
+    return x
+
+
+def _release(blocks, unlink=False):
+    for shm in blocks:
+        try:
+            shm.close()
+        except BufferError:
+            # Something still points into it, the mapping goes when that does
+            pass
+        if unlink:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+    blocks.clear()
+
+
+def _worker(conn, libname, module, options, shared_min):
+    from .gfort2py import fFort
+
+    # intent(in) arguments can not have changed, so are not sent back
+    options = dict(options, drop_intent_in=True)
+    fort = fFort.from_module(ctypes.CDLL(libname), module, **options)
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+
+        name, args, kwargs = task
+        inputs = []
+        outputs = []
+        try:
+            args = _unshare(args, inputs)
+            kwargs = _unshare(kwargs, inputs)
+            res = getattr(fort, name)(*args, **kwargs)
+            # Some argument arrays point into memory owned by res, so keep
+            # it alive until they have been copied
+            out = res
+            if isinstance(res, Result):
+                out = Result(res.result, dict(res.args))
+            reply = (True, _share(out, shared_min, outputs))
+        except Exception as e:
+            reply = (False, e)
+        del args, kwargs
+        res = out = None
+
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Most likely the exception could not be pickled
+            conn.send((False, RuntimeError(f"{name}: {e!r}")))
+
+        reply = None
+        _release(inputs)
+        _release(outputs)
+
+
+class _Worker:
+    def __init__(self, pool):
+        self.conn, child = pool._context.Pipe()
+        self.process = pool._context.Process(
+            target=_worker,
+            args=(child, pool._libname, pool._module, pool._options, pool._shared_min),
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.process.join()
+        self.conn.close()
+
+
+class fPool:
+    """
+    Runs procedures from a library in a pool of worker processes.
+
+    Each worker loads the library once and keeps it, so module variables
+    live on between calls but are separate in each worker. numpy arrays of
+    at least shared_min bytes are passed to and from the workers through
+    shared memory rather than being pickled.
+
+    A worker that dies (for instance the Fortran code calls stop) or runs
+    for longer than the timeout (in seconds) is replaced and that call
+    raises RuntimeError or TimeoutError. The other calls are unaffected.
+
+    Only intent(out) and intent(inout) arguments are sent back in the
+    result's args. Other keyword arguments (cache_dir, lazy, stdout) are as
+    for fFort.
+    """
+
+    def __init__(
+        self,
+        libname,
+        mod_file,
+        workers=None,
+        timeout=None,
+        shared_min=_SHARED_MIN,
+        context="spawn",
+        cache_dir=None,
+        lazy=False,
+        **options,
+    ):
+        self._libname = os.path.abspath(libname)
+        self._module = load_module(mod_file, cache_dir, lazy=lazy)
+        self._options = options
+        self._shared_min = shared_min
+        self._context = multiprocessing.get_context(context)
+        self.timeout = timeout
+
+        self._tasks = queue.Queue()
+        self._shutdown = False
+        self._threads = []
+        for _ in range(workers or os.cpu_count() or 1):
+            thread = threading.Thread(target=self._run, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def keys(self):
+        return self._module.keys()
+
+    def submit(self, name, args=(), kwargs=None, timeout=None):
+        """
+        Queue a call of procedure name, returns a concurrent.futures.Future.
+        timeout defaults to the pool's timeout.
+        """
+        if self._shutdown:
+            raise RuntimeError("Pool has been shut down")
+        if name not in self._module.keys() or not self._module[name].is_procedure():
+            raise AttributeError(f"{self._module.filename} has no procedure {name}")
+
+        future = concurrent.futures.Future()
+        if timeout is None:
+            timeout = self.timeout
+        self._tasks.put((future, name, args, kwargs or {}, timeout))
+        return future
+
+    def call(self, name, *args, **kwargs):
+        return self.submit(name, args, kwargs).result()
+
+    def map(self, name, iterable, timeout=None):
+        """
+        Call procedure name once for each item of iterable, spread over the
+        workers, returning the results in order. Each item is either a dict
+        of keyword arguments or a sequence of positional arguments.
+        """
+        futures = []
+        for item in iterable:
+            if isinstance(item, collections.abc.Mapping):
+                futures.append(self.submit(name, kwargs=item, timeout=timeout))
+            else:
+                futures.append(self.submit(name, args=item, timeout=timeout))
+        return [f.result() for f in futures]
+
+    def __getattr__(self, key):
+        if "_module" in self.__dict__ and key in self._module.keys():
+            if self._module[key].is_procedure():
+                return _PoolProc(self, key)
+        raise AttributeError(f"Pool has no procedure {key}")
+
+    def _run(self):
+        worker = None
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+
+            future, name, args, kwargs, timeout = task
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            if worker is None:
+                worker = _Worker(self)
+
+            inputs = []
+            try:
+                # Failing to make shared memory is not the worker's fault
+                message = (
+                    name,
+                    _share(args, self._shared_min, inputs),
+                    _share(kwargs, self._shared_min, inputs),
+                )
+            except BaseException as e:
+                _release(inputs, unlink=True)
+                future.set_exception(e)
+                continue
+
+            try:
+                worker.conn.send(message)
+                if not worker.conn.poll(timeout):
+                    worker.stop(kill=True)
+                    worker = None
+                    future.set_exception(
+                        TimeoutError(f"{name} did not finish within {timeout}s")
+                    )
+                    continue
+                ok, value = worker.conn.recv()
+            except (EOFError, OSError):
+                worker.process.join()
+                code = worker.process.exitcode
+                worker.stop()
+                worker = None
+                future.set_exception(
+                    RuntimeError(f"Worker exited with code {code} while calling {name}")
+                )
+                continue
+            except BaseException as e:
+                future.set_exception(e)
+                continue
+            finally:
+                message = None
+                _release(inputs, unlink=True)
+
+            if ok:
+                outputs = []
+                try:
+                    value = _unshare(value, outputs, copy=True)
+                finally:
+                    _release(outputs, unlink=True)
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+        if worker is not None:
+            worker.stop()
+
+    def shutdown(self, wait=True):
+        if self._shutdown:
+            return
+        self._shutdown = True
+        for _ in self._threads:
+            self._tasks.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.shutdown()
+
+    def __str__(self):
+        return f"{self._module.filename}"
+
+
+class _PoolProc:
+    __slots__ = ("pool", "name")
+
+    def __init__(self, pool, name):
+        self.pool = pool
+        self.name = name
+
+    def __call__(self, *args, **kwargs):
+        return self.pool.call(self.name, *args, **kwargs)
+
+    def submit(self, *args, **kwargs):
+        return self.pool.submit(self.name, args, kwargs)
+
+    def map(self, iterable, timeout=None):
+        return self.pool.map(self.name, iterable, timeout=timeout)
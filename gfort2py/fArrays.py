@@ -1,12 +1,25 @@
 import ctypes
+import weakref
+
 import numpy as np
 
 from .fVar_t import fVar_t
-
+from . import ctype_cache
 
 _index_t = ctypes.c_int64
 _size_t = ctypes.c_int64
 
+try:
+    _libc = ctypes.CDLL(None)
+    _libc.malloc.restype = ctypes.c_void_p
+    _libc.malloc.argtypes = [ctypes.c_size_t]
+    _libc.calloc.restype = ctypes.c_void_p
+    _libc.calloc.argtypes = [ctypes.c_size_t, ctypes.c_size_t]
+    _libc.free.restype = None
+    _libc.free.argtypes = [ctypes.c_void_p]
+except (OSError, TypeError, AttributeError):
+    _libc = None
+
 
 class _bounds14(ctypes.Structure):
     _fields_ = [("stride", _index_t), ("lbound", _index_t), ("ubound", _index_t)]
@@ -23,21 +36,35 @@ class _dtype_type(ctypes.Structure):
 
 
 def _make_fAlloc15(ndims):
-    class _fAllocArray(ctypes.Structure):
-        _fields_ = [
-            ("base_addr", ctypes.c_void_p),
-            ("offset", _size_t),
-            ("dtype", _dtype_type),
-            ("span", _index_t),
-            ("dims", _bounds14 * ndims),
-        ]
+    def make():
+        class _fAllocArray(ctypes.Structure):
+            _fields_ = [
+                ("base_addr", ctypes.c_void_p),
+                ("offset", _size_t),
+                ("dtype", _dtype_type),
+                ("span", _index_t),
+                ("dims", _bounds14 * ndims),
+            ]
+
+        return _fAllocArray
 
-    return _fAllocArray
+    return ctype_cache.get(("descriptor", ndims), make)
+
+
+def _share_array(ctype, value):
+    """
+    A ctypes array of type ctype using the memory of the 1d array value,
+    or None if it has to be copied
+    """
+    if not value.flags.writeable or value.nbytes != ctypes.sizeof(ctype):
+        return None
+    return ctype.from_buffer(value)
 
 
 class fArray_t(fVar_t):
     def _array_check(self, value, know_shape=True):
-        value = value.astype(self.obj.dtype())
+        # Only copies if value is not already the right type and order
+        value = value.astype(self.obj.dtype(), copy=False)
         shape = self.obj.shape()
         ndim = self.obj.ndim
 
@@ -50,7 +77,7 @@ class fArray_t(fVar_t):
             )
 
         if know_shape:
-            if not self.obj.is_allocatable and list(value.shape) != shape:
+            if not self.obj.is_allocatable() and list(value.shape) != shape:
                 raise ValueError(f"Wrong shape, got {value.shape} expected {shape}")
 
         value = value.ravel(order="F")
@@ -70,13 +97,20 @@ class fArray_t(fVar_t):
 
 class fExplicitArr(fArray_t):
     def ctype(self):
-        return self._ctype_base * self.obj.size
+        return ctype_cache.array(self._ctype_base, self.obj.size)
 
     def from_param(self, value):
+        self._value = self._array_check(value)
+
         if self.cvalue is None:
+            # Pass the array's own memory when it can be used as is, the
+            # ctypes array keeps it alive and changes are seen by the caller
+            cvalue = _share_array(self.ctype(), self._value)
+            if cvalue is not None:
+                self.cvalue = cvalue
+                return self.cvalue
             self.cvalue = self.ctype()()
 
-        self._value = self._array_check(value)
         self._copy_array(
             self._value.ctypes.data,
             ctypes.addressof(self.cvalue),
@@ -85,6 +119,26 @@ class fExplicitArr(fArray_t):
         )
         return self.cvalue
 
+    def allocate(self, like=None):
+        # Fortran overwrites the contents so only check like's shape
+        if like is not None and list(np.shape(like)) != self.obj.shape():
+            raise ValueError(
+                f"Wrong shape, got {np.shape(like)} expected {self.obj.shape()}"
+            )
+
+        # An array that can be used as is is written to directly
+        if (
+            isinstance(like, np.ndarray)
+            and like.dtype == self.obj.dtype()
+            and like.flags.f_contiguous
+        ):
+            self.cvalue = _share_array(self.ctype(), like.ravel(order="F"))
+            if self.cvalue is not None:
+                return self.cvalue
+
+        self.cvalue = self.ctype()()
+        return self.cvalue
+
     @property
     def value(self):
         return np.ctypeslib.as_array(self.cvalue).reshape(self.obj.shape(), order="F")
@@ -93,6 +147,12 @@ class fExplicitArr(fArray_t):
     def value(self, value):
         self.from_param(value)
 
+    def view(self):
+        # The storage is fixed so one array serves every call
+        if getattr(self, "_view", None) is None:
+            self._view = self.value
+        return self._view
+
     def __doc__(self):
         return f"{self.type}(KIND={self.kind})({self.obj.shape()}) :: {self.name}"
 
@@ -117,41 +177,41 @@ class fAssumedShape(fArray_t):
     _BT_VOID = _BT_HOLLERITH + 1
     _BT_ASSUMED = _BT_VOID + 1
 
+    _in_dll = False
+
     def ctype(self):
         return _make_fAlloc15(self.obj.ndim)
 
+    def in_dll(self, lib):
+        self._in_dll = True
+        return super().in_dll(lib)
+
     def from_param(self, value):
         if self.cvalue is None:
             self.cvalue = self.ctype()()
 
         if value is not None:
-            self._value = self._array_check(value, False)
-
-            # self._copy_array(
-            #     self._value.ctypes.data,
-            #     self.cvalue.base_addr,
-            #     ctypes.sizeof(self._ctype_base()),
-            #     np.size(value)
-            # )
-            self.cvalue.base_addr = self._value.ctypes.data
-
-            self.cvalue.span = ctypes.sizeof(self._ctype_base())
-
-            strides = []
             shape = np.shape(value)
-            for i in range(self.ndim):
-                self.cvalue.dims[i].lbound = _index_t(1)
-                self.cvalue.dims[i].ubound = _index_t(shape[i])
-                strides.append(
-                    self.cvalue.dims[i].ubound - self.cvalue.dims[i].lbound + 1
-                )
-
-            spans = []
-            for i in range(self.ndim):
-                spans.append(int(np.prod(strides[:i])))
-                self.cvalue.dims[i].stride = _index_t(spans[-1])
-
-            self.cvalue.offset = -np.sum(spans)
+            strides = self._describable(value)
+            if strides is not None:
+                # The descriptor points straight at value's memory, strides
+                # and all, keeping value alive keeps the memory alive
+                self._value = value
+                self.cvalue.base_addr = value.ctypes.data
+            else:
+                self._value = self._array_check(value, False)
+                strides = [int(np.prod(shape[:i])) for i in range(self.ndim)]
+
+                if self._in_dll and self.obj.is_allocatable() and _libc is not None:
+                    # Fortran may later deallocate or reallocate a module
+                    # allocatable, so it can not be left pointing at numpy memory
+                    self.cvalue.base_addr = self._malloc_copy(self._value)
+                    # Only the malloc'd copy is used from now on
+                    self._value = None
+                else:
+                    self.cvalue.base_addr = self._value.ctypes.data
+
+            self._set_dims(shape, strides)
 
         self.cvalue.dtype.elem_len = self.cvalue.span
         self.cvalue.dtype.version = 0
@@ -161,27 +221,84 @@ class fAssumedShape(fArray_t):
 
         return self.cvalue
 
+    def allocate(self, like=None):
+        if self.obj.is_allocatable() or self.obj.is_pointer():
+            # Fortran allocates it, anything passed in would be deallocated
+            return self.from_param(None)
+        if like is None:
+            raise TypeError(f"Can not allocate {self.name} without an array to size it")
+        if np.ndim(like) != self.obj.ndim:
+            raise ValueError(
+                f"Wrong number of dimensions, got {np.ndim(like)} "
+                f"expected {self.obj.ndim}"
+            )
+        if self._describable(like) is not None:
+            # Fortran can write straight into it
+            return self.from_param(like)
+        return self.from_param(
+            np.zeros(np.shape(like), dtype=self.obj.dtype(), order="F")
+        )
+
+    def _describable(self, value):
+        """
+        The strides, in elements, to describe value as it is, or None if it
+        has to be copied
+        """
+        if not isinstance(value, np.ndarray) or self.obj.is_allocatable():
+            # Allocatable arrays are always contiguous and owned by Fortran
+            return None
+        if value.dtype != self.obj.dtype() or value.ndim != self.obj.ndim:
+            return None
+        if not value.flags.writeable and not self.obj.is_intent_in():
+            return None
+
+        itemsize = value.itemsize
+        for n, s in zip(value.shape, value.strides):
+            # gfortran treats a zero stride as unset, so broadcast arrays
+            # have to be copied
+            if s % itemsize or (s == 0 and n > 1):
+                return None
+        return [s // itemsize for s in value.strides]
+
     @property
     def value(self):
         if self.cvalue.base_addr is None:
             return None
 
-        shape = []
-        for i in range(self.obj.ndim):
-            shape.append(self.cvalue.dims[i].ubound - self.cvalue.dims[i].lbound + 1)
+        dims = self.cvalue.dims[: self.obj.ndim]
+        dtype = np.dtype(self._ctype_base)
+        # span is the distance in bytes between elements that stride counts
+        span = self.cvalue.span or dtype.itemsize
 
-        shape = tuple(shape)
-        size = (np.prod(shape),)
+        shape = tuple(max(d.ubound - d.lbound + 1, 0) for d in dims)
+        strides = tuple(d.stride * span for d in dims)
 
-        PTR = ctypes.POINTER(self._ctype_base)
-        x_ptr = ctypes.cast(self.cvalue.base_addr, PTR)
+        # Map from the lowest to the highest address used, with negative
+        # strides the first element is not at the start
+        low = sum(min(0, (n - 1) * s) for n, s in zip(shape, strides) if n)
+        high = sum(max(0, (n - 1) * s) for n, s in zip(shape, strides) if n)
+        if 0 in shape:
+            high = low - dtype.itemsize
 
-        return np.ctypeslib.as_array(x_ptr, shape=size).reshape(shape, order="F")
+        buf = (ctypes.c_char * (high - low + dtype.itemsize)).from_address(
+            self.cvalue.base_addr + low
+        )
+        return np.ndarray(shape, dtype, buffer=buf, offset=-low, strides=strides)
 
     @value.setter
     def value(self, value):
         self.from_param(value)
 
+    def view(self):
+        # Only rebuild the array when Fortran has (re)allocated it
+        key = (self.cvalue.base_addr,) + tuple(
+            (d.lbound, d.ubound, d.stride) for d in self.cvalue.dims
+        )
+        if getattr(self, "_view_key", None) != key:
+            self._view = self.value
+            self._view_key = key
+        return self._view
+
     def __doc__(self):
         return f"{self.type}(KIND={self.kind})(:) :: {self.name}"
 
@@ -196,10 +313,91 @@ class fAssumedShape(fArray_t):
             return self._BT_COMPLEX
 
         raise NotImplementedError(
-            f"Assumed shape array of type {self.type} and kind {self.kind} not supported yet"
+            f"Assumed shape array of type {self.type} and kind {self.kind} "
+            "not supported yet"
         )
 
+    def _set_dims(self, shape, strides):
+        self.cvalue.span = ctypes.sizeof(self._ctype_base())
+
+        for i in range(self.ndim):
+            self.cvalue.dims[i].lbound = _index_t(1)
+            self.cvalue.dims[i].ubound = _index_t(shape[i])
+            self.cvalue.dims[i].stride = _index_t(strides[i])
+
+        self.cvalue.offset = -sum(strides)
+
+    def malloc(self, shape, fill=None):
+        """
+        Allocate a module allocatable array as Fortran would, with malloc,
+        so Fortran owns it and can deallocate it. Any existing allocation
+        is freed. The contents are zero, or fill if given. Returns a numpy
+        view of the new array.
+        """
+        self._check_owned()
+
+        shape = tuple(int(i) for i in np.atleast_1d(shape))
+        if len(shape) != self.ndim:
+            raise ValueError(
+                f"Wrong number of dimensions, got {len(shape)} expected {self.ndim}"
+            )
+
+        itemsize = ctypes.sizeof(self._ctype_base)
+        addr = _libc.calloc(max(int(np.prod(shape)), 1), itemsize)
+        if not addr:
+            raise MemoryError(f"Could not allocate {self.name}")
+
+        if self.cvalue.base_addr:
+            _libc.free(self.cvalue.base_addr)
+        self.from_param(None)
+        self.cvalue.base_addr = addr
+        self._set_dims(shape, [int(np.prod(shape[:i])) for i in range(self.ndim)])
+        self.cvalue.dtype.elem_len = self.cvalue.span
+
+        arr = self.value
+        if fill is not None:
+            arr[...] = fill
+        return arr
+
+    def adopt(self):
+        """
+        Take a module allocatable array away from Fortran without copying.
+        The returned numpy array owns the memory and frees it once it (and
+        every view of it) is gone, the Fortran variable is left unallocated.
+        Returns None if the variable is not allocated.
+        """
+        self._check_owned()
+
+        arr = self.value
+        if arr is None:
+            return None
+
+        weakref.finalize(arr.base, _libc.free, self.cvalue.base_addr)
+        self.cvalue.base_addr = None
+        return arr
+
+    def _check_owned(self):
+        if not (self._in_dll and self.obj.is_allocatable()):
+            raise TypeError(f"{self.name} is not an allocatable module variable")
+        if _libc is None:
+            raise NotImplementedError("Can not find malloc")
+
+    def _malloc_copy(self, value):
+        addr = _libc.malloc(max(value.nbytes, 1))
+        if not addr:
+            raise MemoryError(f"Could not allocate {self.name}")
+        ctypes.memmove(addr, value.ctypes.data, value.nbytes)
+
+        # Whatever was there before came from malloc too, either here or
+        # from Fortran, and is being replaced
+        if self.cvalue.base_addr:
+            _libc.free(self.cvalue.base_addr)
+        return addr
+
     def __del__(self):
+        if self._in_dll:
+            # The descriptor is Fortran's, leave it alone
+            return
         if self.cvalue is not None:
             self.cvalue.base_addr = None
 
@@ -225,11 +423,15 @@ class fAssumedShape(fArray_t):
 
 class fAssumedSize(fArray_t):
     def ctype(self):
-        return self._ctype_base * np.prod(self._value.shape)
+        return ctype_cache.array(self._ctype_base, np.prod(self._value.shape))
 
     def from_param(self, value):
-        self._value = self._array_check(value)
+        self._value = self._array_check(value, False)
         if self.cvalue is None:
+            cvalue = _share_array(self.ctype(), self._value)
+            if cvalue is not None:
+                self.cvalue = cvalue
+                return self.cvalue
             self.cvalue = self.ctype()()
 
         self._copy_array(
@@ -240,6 +442,13 @@ class fAssumedSize(fArray_t):
         )
         return self.cvalue
 
+    def allocate(self, like=None):
+        if like is None:
+            raise TypeError(f"Can not allocate {self.name} without an array to size it")
+        self._value = np.zeros(np.size(like), dtype=self.obj.dtype())
+        self.cvalue = self.ctype()()
+        return self.cvalue
+
     @property
     def value(self):
         return np.ctypeslib.as_array(self.cvalue, shape=np.size(self._value)).reshape(
@@ -1,10 +1,13 @@
+import collections
+import collections.abc
 import ctypes
+import threading
+import weakref
+
 import numpy as np
 
 from .fVar_t import fVar_t
-
-
-_all_dts = {}
+from . import ctype_cache
 
 
 def make_dt(name):
@@ -15,53 +18,196 @@ def make_dt(name):
     return _fDerivedType
 
 
-class fDT(fVar_t):
-    def __init__(self, obj, fvar, allobjs=None, cvalue=None):
-        self.obj = obj
-        self.fvar = fvar
-        self.allobjs = allobjs
-        self.cvalue = cvalue
+# How each component is read and written
+_SCALAR = 0  # Numbers, read and written through the ctypes field
+_LOGICAL = 1
+_ARRAY = 2  # Explicit shape numeric arrays, returned as numpy views
+_DERIVED = 3  # Nested derived types, returned as an fDT sharing the memory
+_OTHER = 4  # Everything else goes through an fVar
+_DERIVED_ARRAY = 5  # Explicit shape arrays of derived types, an fExplicitDT
 
-        # Get obj for derived type spec
-        self._dt_obj = self.allobjs[self.obj.dt_type()]
-        self._dt_name = self._dt_obj.name
+_Field = collections.namedtuple(
+    "_Field", ["name", "obj", "how", "offset", "dtype", "shape"]
+)
 
-        self._init_args()
 
-        self._ctype = None
+class _Layout:
+    """
+    A derived type's ctypes Structure plus where and how each component is
+    stored, worked out once and shared by every fDT of that type
+    """
 
-    def _init_args(self):
-        # Store fVar's for each component
-        self._dt_args = {}
-        for var in self._dt_obj.dt_components():
+    def __init__(self, dt_type, fvar, allobjs):
+        dt_obj = allobjs[dt_type]
+        self.name = dt_obj.name
+
+        fvars = []
+        for var in dt_obj.dt_components():
             # Catch dt's which contain themselves:
-            if var.is_derived() and var.dt_type() == self.obj.dt_type():
+            if var.is_derived() and var.dt_type() == dt_type:
                 raise NotImplementedError(
                     "Derived types containing themselves not supported yet"
                 )
+            fvars.append(fvar(var, allobjs=allobjs))
 
-            self._dt_args[var.name] = self.fvar(var, allobjs=self.allobjs)
-
-    def ctype(self):
-        if self._ctype is None:
-            fields = []
-            for var in self._dt_obj.dt_components():
-                fields.append((var.name, self._dt_args[var.name].ctype()))
+        fields = tuple((f.name, f.ctype()) for f in fvars)
 
+        def make():
             class _fDerivedType(ctypes.Structure):
-                _fields_ = fields
-
-            if self._dt_name not in _all_dts:
-                _all_dts[self._dt_name] = _fDerivedType
+                _fields_ = list(fields)
+
+            return _fDerivedType
+
+        # Keyed on the layout too, types in different modules may share a name
+        self.ctype = ctype_cache.get(("derived", self.name, fields), make)
+
+        self.fields = {}
+        for f in fvars:
+            offset = getattr(self.ctype, f.name).offset
+            how, dtype, shape = _OTHER, None, None
+            if f.obj.is_derived():
+                if not f.obj.is_array():
+                    how = _DERIVED
+                elif f.obj.is_explicit():
+                    how, shape = _DERIVED_ARRAY, tuple(f.obj.shape())
+            elif f.obj.is_pointer() or f.obj.is_allocatable():
+                pass
+            elif f.type in ("INTEGER", "REAL") and f.kind in (4, 8):
+                dtype = np.dtype(f._ctype_base)
+                if not f.obj.is_array():
+                    how = _SCALAR
+                elif f.obj.is_explicit():
+                    how, shape = _ARRAY, tuple(f.obj.shape())
+            elif f.type == "LOGICAL" and not f.obj.is_array():
+                how = _LOGICAL
+            self.fields[f.name] = _Field(f.name, f.obj, how, offset, dtype, shape)
+
+        self._make_dtype(fvars)
+
+    def _make_dtype(self, fvars):
+        # The numpy structured dtype for the components numpy can hold, plain
+        # is False if any (pointers, allocatables, ...) had to be left out
+        self.plain = True
+        self.chars = []
+        self.nested = []
+        names, formats, offsets = [], [], []
+        for f in fvars:
+            field = self.fields[f.name]
+            if field.how == _SCALAR:
+                fmt = field.dtype
+            elif field.how == _LOGICAL:
+                fmt = np.dtype(np.int32)
+            elif field.how == _ARRAY:
+                # numpy sub-arrays are C ordered, so multi-dimensional
+                # components appear transposed
+                fmt = (field.dtype, field.shape[::-1])
+            elif field.how == _DERIVED or field.how == _DERIVED_ARRAY:
+                fmt = f._layout.dtype
+                if field.how == _DERIVED_ARRAY:
+                    fmt = (fmt, field.shape[::-1])
+                self.plain = self.plain and f._layout.plain
+                self.nested.append((f.name, f._layout))
+            elif f.obj.is_array() or f.obj.is_pointer() or f.obj.is_allocatable():
+                fmt = None
+            elif f.type == "CHARACTER":
+                fmt = np.dtype(f"S{ctypes.sizeof(f.ctype())}")
+                self.chars.append(f.name)
+            elif f.type == "COMPLEX" and f.kind in (4, 8):
+                fmt = np.dtype(np.complex64 if f.kind == 4 else np.complex128)
             else:
-                try:
-                    _all_dts[self._dt_name]._fields_ = fields
-                except AttributeError:
-                    pass
+                fmt = None
+
+            if fmt is None:
+                self.plain = False
+                continue
+            names.append(f.name)
+            formats.append(fmt)
+            offsets.append(field.offset)
+
+        self.dtype = np.dtype(
+            {
+                "names": names,
+                "formats": formats,
+                "offsets": offsets,
+                "itemsize": ctypes.sizeof(self.ctype),
+            }
+        )
+
+    def is_blank_padded(self, arr):
+        """
+        True if no CHARACTER component of the structured array arr is NUL padded
+        """
+        for name in self.chars:
+            if np.any(np.char.str_len(arr[name]) < arr.dtype[name].itemsize):
+                return False
+        for name, layout in self.nested:
+            if not layout.is_blank_padded(arr[name]):
+                return False
+        return True
+
+    def blank_pad(self, arr, names=None):
+        """
+        numpy pads bytes with NULs where Fortran expects blanks, so blank pad
+        the CHARACTER components (of those in names) of the structured array arr
+        """
+        for name in self.chars:
+            if names is None or name in names:
+                arr[name] = np.char.ljust(arr[name], arr.dtype[name].itemsize, b" ")
+        for name, layout in self.nested:
+            if names is None or name in names:
+                layout.blank_pad(arr[name])
+
+
+_layouts = weakref.WeakKeyDictionary()
+_layouts_lock = threading.RLock()
+
+
+def _layout(dt_type, fvar, allobjs):
+    # Layouts are per module, as that is what dt_type refers to
+    try:
+        return _layouts[allobjs][dt_type]
+    except KeyError:
+        pass
 
-            self._ctype = _all_dts[self._dt_name]
+    with _layouts_lock:
+        layouts = _layouts.setdefault(allobjs, {})
+        if dt_type not in layouts:
+            layouts[dt_type] = _Layout(dt_type, fvar, allobjs)
+        return layouts[dt_type]
 
-        return self._ctype
+
+class fDT(fVar_t):
+    def __init__(self, obj, fvar, allobjs=None, cvalue=None):
+        self.obj = obj
+        self.fvar = fvar
+        self.allobjs = allobjs
+        self.cvalue = cvalue
+
+        # Get obj for derived type spec
+        self._dt_obj = self.allobjs[self.obj.dt_type()]
+        self._dt_name = self._dt_obj.name
+
+        # fVar's for the components that need them, made on first use
+        self._dt_args = {}
+        self._layout = _layout(self.obj.dt_type(), self.fvar, self.allobjs)
+
+    def ctype(self):
+        return self._layout.ctype
+
+    def _field(self, key):
+        try:
+            return self._layout.fields[key]
+        except KeyError:
+            raise KeyError(f"{key} not present in {self._dt_name}") from None
+
+    def _arg(self, field):
+        # An fVar over the component's memory, kept as it may hold on to
+        # memory the component points at
+        if field.name not in self._dt_args:
+            self._dt_args[field.name] = self.fvar(field.obj, allobjs=self.allobjs)
+        arg = self._dt_args[field.name]
+        arg.from_address(ctypes.addressof(self.cvalue) + field.offset)
+        return arg
 
     def from_ctype(self, ct):
         self.cvalue = ct
@@ -79,28 +225,7 @@ class fDT(fVar_t):
         if self.cvalue is None:
             self.cvalue = self.ctype()()
 
-        for key, value in param.items():
-            if key not in self._dt_args:
-                raise KeyError(f"{key} not present in {self._dt_obj.name}")
-
-            if self._dt_args[key].obj.is_derived():
-                self._dt_args[key] = self.fvar(
-                    self.allobjs[key],
-                    allobjs=self.allobjs,
-                    cvalue=getattr(self.cvalue, key),
-                )
-                for k, v in value.items():
-                    self._dt_args[key].__setitem__(k, v)
-            else:
-                if not isinstance(value, fVar_t):
-                    self._dt_args[key].from_param(value)
-                else:
-                    self._dt_args[key].from_ctype(value.cvalue())
-
-                v = self._dt_args[key].cvalue
-
-                setattr(self.cvalue, key, v)
-
+        self.update(param)
         return self.cvalue
 
     @property
@@ -111,8 +236,37 @@ class fDT(fVar_t):
     def value(self, value):
         self.from_param(value)
 
+    def update(self, values=(), **kwargs):
+        """
+        Set several components at once, from a dict (or another derived type)
+        and/or keyword arguments
+        """
+        if hasattr(values, "items"):
+            values = values.items()
+        for key, value in values:
+            self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def to_dict(self):
+        """
+        A copy of every component, nested derived types become dicts and
+        arrays of derived types lists of dicts, in Fortran order
+        """
+        result = {}
+        for key, field in self._layout.fields.items():
+            value = self[key]
+            if field.how == _ARRAY:
+                value = value.copy()
+            elif field.how == _DERIVED:
+                value = value.to_dict()
+            elif field.how == _DERIVED_ARRAY:
+                value = [value[i].to_dict() for i in range(value.obj.size)]
+            result[key] = value
+        return result
+
     def keys(self):
-        return [i.name for i in self._dt_obj.dt_components()]
+        return list(self._layout.fields.keys())
 
     def values(self):
         return [self.__getitem__(key) for key in self.keys()]
@@ -121,26 +275,49 @@ class fDT(fVar_t):
         return [(key, self.__getitem__(key)) for key in self.keys()]
 
     def __contains__(self, key):
-        return key in self.keys()
+        return key in self._layout.fields
 
     def __getitem__(self, key):
-        if key in self._dt_args:
-            return self._dt_args[key].from_ctype(getattr(self.cvalue, key))
-        else:
-            raise KeyError(f"{key} not present in {self._dt_obj.name}")
+        field = self._field(key)
+        if field.how == _SCALAR:
+            return getattr(self.cvalue, key)
+        elif field.how == _LOGICAL:
+            return getattr(self.cvalue, key) == 1
+        elif field.how == _ARRAY:
+            # A view, changes go straight into the derived type
+            return np.ndarray(
+                field.shape,
+                field.dtype,
+                buffer=self.cvalue,
+                offset=field.offset,
+                order="F",
+            )
+        return self._arg(field).value
 
     def __setitem__(self, key, value):
-        if key in self._dt_args:
-            self.from_param({key: value})
+        field = self._field(key)
+        if self.cvalue is None:
+            self.cvalue = self.ctype()()
+
+        if field.how == _SCALAR or field.how == _LOGICAL:
+            setattr(self.cvalue, key, value)
+        elif field.how == _ARRAY:
+            if np.shape(value) != field.shape:
+                raise ValueError(
+                    f"Wrong shape, got {np.shape(value)} expected {field.shape}"
+                )
+            self[key][...] = value
+        elif isinstance(value, fVar_t) and field.how not in (_DERIVED, _DERIVED_ARRAY):
+            self._arg(field).from_param(value.value)
         else:
-            raise KeyError(f"{key} not present in {self._dt_obj.name}")
+            self._arg(field).from_param(value)
 
     def __dir__(self):
-        return list(self._dt_args.keys())
+        return self.keys()
 
     def __getattr__(self, key):
-        if "_dt_args" in self.__dict__:
-            if key in self._dt_args:
+        if "_layout" in self.__dict__:
+            if key in self._layout.fields:
                 raise AttributeError("Can't get components as attributes")
 
         if key in self.__dict__:
@@ -149,8 +326,8 @@ class fDT(fVar_t):
             raise AttributeError
 
     def __setattr__(self, key, value):
-        if "_dt_args" in self.__dict__:
-            if key in self._dt_args:
+        if "_layout" in self.__dict__:
+            if key in self._layout.fields:
                 raise AttributeError("Can't set components as attributes")
 
         if key == "value":
@@ -170,16 +347,55 @@ class fExplicitDT(fVar_t):
         self._dt_obj = self.allobjs[self.obj.dt_type()]
 
         self._dt_ctype = fDT(self.obj, self.fvar, allobjs=self.allobjs)
+        self._layout = self._dt_ctype._layout
         self._saved = {}
 
     def ctype(self):
-        self._ctype = self._dt_ctype.ctype() * self.obj.size
+        self._ctype = ctype_cache.array(self._dt_ctype.ctype(), self.obj.size)
         return self._ctype
 
-    def __getitem__(self, index):
+    def from_address(self, addr):
+        # The elements made so far point at the old memory
+        self._saved = {}
+        self.cvalue = self.ctype().from_address(addr)
+        return self.cvalue
+
+    @property
+    def dtype(self):
+        return self._layout.dtype
+
+    def view(self):
+        """
+        The array as a numpy structured array sharing the Fortran storage,
+        so view()['x'] is the x component of every element.
+
+        numpy sub-arrays are C ordered, so multi-dimensional components are
+        transposed here, unlike through self['x'] or self[i]['x']. CHARACTER
+        components written through the view are NUL padded, not blank padded.
+        """
         if self.cvalue is None:
             self.cvalue = self.ctype()()
+        return np.ndarray(
+            self.obj.shape(), self._layout.dtype, buffer=self.cvalue, order="F"
+        )
+
+    def _column(self, key):
+        if key not in self._layout.dtype.names:
+            if key in self._layout.fields:
+                raise TypeError(f"{key} can not be accessed as a column")
+            raise KeyError(f"{key} not present in {self._dt_obj.name}")
+        column = self.view()[key]
+
+        field = self._layout.fields[key]
+        if field.how == _ARRAY or field.how == _DERIVED_ARRAY:
+            # Undo the transposing of the component, so column[i] matches self[i][key]
+            lead = column.ndim - len(field.shape)
+            column = column.transpose(
+                list(range(lead)) + list(range(column.ndim - 1, lead - 1, -1))
+            )
+        return column
 
+    def _index(self, index):
         if isinstance(index, tuple):
             ind = np.ravel_multi_index(index, self.obj.shape(), order="F")
         else:
@@ -195,31 +411,70 @@ class fExplicitDT(fVar_t):
 
         return self._saved[ind]
 
+    def __getitem__(self, index):
+        if isinstance(index, str):
+            return self._column(index)
+
+        if self.cvalue is None:
+            self.cvalue = self.ctype()()
+
+        return self._index(index)
+
     def __setitem__(self, index, value):
+        if isinstance(index, str):
+            self._column(index)[...] = value
+            self._layout.blank_pad(self.view(), [index])
+            return
+
         if self.cvalue is None:
             self.cvalue = self.ctype()()
 
-        if isinstance(index, tuple):
-            ind = np.ravel_multi_index(index, self.obj.shape(), order="F")
+        self._index(index).value = value
+
+    def from_param(self, param):
+        if isinstance(param, np.ndarray) and param.dtype.names is not None:
+            return self._from_structured(param)
+
+        if self.cvalue is None:
+            self.cvalue = self.ctype()()
+
+        if isinstance(param, collections.abc.Mapping):
+            # A dict of columns
+            for key, value in param.items():
+                self.__setitem__(key, value)
         else:
-            ind = index
+            for index, value in enumerate(param):
+                self.__setitem__(index, value)
 
-        if ind > self.obj.size:
-            raise IndexError("Out of bounds")
+        return self.cvalue
 
-        if ind not in self._saved:
-            self._saved[ind] = fDT(
-                self.obj, allobjs=self.allobjs, cvalue=self.cvalue[ind]
+    def _from_structured(self, param):
+        if list(param.shape) != self.obj.shape():
+            raise ValueError(
+                f"Wrong shape, got {param.shape} expected {tuple(self.obj.shape())}"
             )
 
-        self._saved[ind].value = value
+        if (
+            self.cvalue is None
+            and self._layout.plain
+            and param.dtype == self._layout.dtype
+            and param.flags.f_contiguous
+            and param.flags.writeable
+            and self._layout.is_blank_padded(param)
+        ):
+            # Laid out exactly as Fortran wants, so pass param's own memory
+            self.cvalue = self.ctype().from_buffer(param)
+            return self.cvalue
 
-    def from_param(self, param):
         if self.cvalue is None:
             self.cvalue = self.ctype()()
 
-        for index, value in enumerate(param):
-            self.__setitem__(index, value)
+        view = self.view()
+        for name in param.dtype.names:
+            if name not in view.dtype.names:
+                raise KeyError(f"{name} not present in {self._dt_obj.name}")
+            view[name] = param[name]
+        self._layout.blank_pad(view, param.dtype.names)
 
         return self.cvalue
 
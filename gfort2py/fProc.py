@@ -1,57 +1,223 @@
 # SPDX-License-Identifier: GPL-2.0+
+import asyncio
 import ctypes
 import os
-import select
 import collections
-import functools
+import collections.abc
+import concurrent.futures
+import contextlib
+import itertools
+import threading
 from dataclasses import dataclass
 
+import numpy as np
+
 from .fVar import fVar
 from .fVar_t import fVar_t
+from .fScalars import fScalar, fCmplx
+from .fArrays import fExplicitArr
+from .capture import StdoutCapture
 
 _TEST_FLAG = os.environ.get("_GFORT2PY_TEST_FLAG") is not None
 
+# Marks an argument batch() should allocate itself
+_ALLOCATE = object()
+
+_capture_lock = threading.RLock()
+
 
 @dataclass
 class variable:
     value: "typing.Any"
     fvar: "typing.Any"
+    passing: "typing.Any" = None
+    intent_out: bool = False
 
 
 class _captureStdOut:
-    def read_pipe(self, pipe_out):
-        def more_data():
-            r, _, _ = select.select([pipe_out], [], [], 0)
-            return bool(r)
-
-        out = b""
-        while more_data():
-            out += os.read(pipe_out, 1024)
-        return out.decode()
-
     def __enter__(self):
-        if _TEST_FLAG:
-            self.pipe_out, self.pipe_in = os.pipe()
-            self.stdout = os.dup(1)
-            os.dup2(self.pipe_in, 1)
+        self.lines = []
+        self.capture = StdoutCapture(self.lines.append).start()
 
     def __exit__(self, *args, **kwargs):
-        if _TEST_FLAG:
-            os.dup2(self.stdout, 1)
-            print(self.read_pipe(self.pipe_out))
-            os.close(self.pipe_in)
-            os.close(self.pipe_out)
-            os.close(self.stdout)
+        self.capture.stop()
+        print("\n".join(self.lines))
 
 
-class fProc:
-    Result = collections.namedtuple("Result", ["result", "args"])
+@dataclass
+class arg_plan:
+    name: str
+    obj: "typing.Any"
+    make: "typing.Any"  # Builds the fVar_t for this argument
+    passing: "typing.Any"
+    intent_in: bool
+    intent_out: bool
+
+
+class call_plan:
+    """
+    Everything about calling a procedure that does not depend on the
+    arguments, built once per procedure and reused for every call
+    """
+
+    def __init__(self, proc):
+        obj = proc.obj
+        allobjs = proc._allobjs
+        self.allobjs = allobjs
+
+        self.args = []
+        for fval in obj.args():
+            aobj = allobjs[fval.ref]
+            self.args.append(
+                arg_plan(
+                    aobj.name,
+                    aobj,
+                    fVar.resolve(aobj),
+                    fVar_t.passing(aobj),
+                    aobj.is_intent_in(),
+                    aobj.is_intent_out(),
+                )
+            )
+
+        self.keywords = {arg.name: index for index, arg in enumerate(self.args)}
+        self.nargs = len(self.args)
+
+        self.is_function = obj.is_function()
+        self.elemental = obj.is_elemental()
+        self.return_char = False
+        self.return_make = None
+        self.return_convert = None
+        if self.is_function:
+            self.return_obj = proc.return_obj
+            self.return_make = fVar.resolve(self.return_obj)
+            self.return_char = self.return_obj.is_char()
+            self.return_convert = _simple_return(self.return_obj, self.return_make)
+
+        # Set once, not on every call. argtypes is left unset: arguments are
+        # already ctypes objects of the right type and optional arguments
+        # may be None, while argtypes would add a from_param conversion per
+        # argument to every call.
+        if not self.is_function or self.return_char:
+            # Returning a character is done as a character + len at start of arg list
+            proc._func.restype = None
+        else:
+            rvar = self.return_make(self.return_obj, allobjs=self.allobjs)
+            proc._func.restype = rvar.ctype()
+
+    def new_return(self):
+        """
+        A fresh fVar for the function result, None for subroutines or when
+        the result is converted without one
+        """
+        if self.return_make is None or self.return_convert is not None:
+            return None
+        return self.return_make(self.return_obj, allobjs=self.allobjs)
+
+    def bind(self, args, kwargs, missing=None):
+        """
+        Match the passed arguments to the formal arguments, keywords first
+        then positional arguments in order. Missing required arguments are
+        an error unless a missing value is given.
+        """
+        for key in kwargs:
+            if key not in self.keywords:
+                raise TypeError(f"Unexpected keyword argument {key}")
+
+        values = []
+        count = 0
+        for arg in self.args:
+            try:
+                x = kwargs[arg.name]
+            except KeyError:
+                if count < len(args):
+                    x = args[count]
+                    count = count + 1
+                elif arg.obj.is_optional():
+                    x = None
+                elif missing is not None:
+                    x = missing
+                else:
+                    raise TypeError("Not enough arguments passed")
+            values.append(x)
+
+        return values
+
 
-    def __init__(self, lib, obj, allobjs, **kwargs):
+class ResultArgs(collections.abc.Mapping):
+    """
+    The arguments after a call, each is only converted back to python the
+    first time it is accessed
+    """
+
+    __slots__ = ("_vars", "_values", "_from_ctype")
+
+    def __init__(self, vars, from_ctype=False, values=None):
+        self._vars = vars
+        # Arguments whose value is already known, intent(in) ones
+        self._values = {} if values is None else values
+        self._from_ctype = from_ctype
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+
+        fvar = self._vars[key]
+        try:
+            x = ptr_unpack(fvar.value)
+        except AttributeError:  # unset optional arguments
+            x = None
+
+        if self._from_ctype:
+            x = fvar.from_ctype(x)
+
+        self._values[key] = x
+        return x
+
+    def __iter__(self):
+        return iter(self._vars)
+
+    def __len__(self):
+        return len(self._vars)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class Result(collections.namedtuple("Result", ["result", "args"])):
+    """
+    Returned from a procedure call, result is the function's return value
+    (None for subroutines) and args the arguments after the call
+    """
+
+    __slots__ = ()
+
+
+class fProc:
+    Result = Result
+
+    def __init__(
+        self,
+        lib,
+        obj,
+        allobjs,
+        stdout=None,
+        drop_intent_in=False,
+        actor=None,
+        **kwargs,
+    ):
         self._allobjs = allobjs
         self.obj = obj
         self._lib = lib
         self._return_value = None
+        self._plan = None
+        self._lock = threading.Lock()
+        self._stdout = stdout
+        # Leave intent(in) arguments out of the result
+        self.drop_intent_in = drop_intent_in
+        # If set every Fortran call is made on the actor's thread
+        self._actor = actor
 
         self._func = getattr(lib, self.mangled_name)
 
@@ -70,64 +236,72 @@ class fProc:
     def name(self):
         return self.obj.name
 
+    @property
+    def plan(self):
+        if self._plan is None:
+            with self._lock:
+                if self._plan is None:
+                    self._plan = call_plan(self)
+        return self._plan
+
     def __call__(self, *args, **kwargs):
-        self._set_return()
+        if self.plan.elemental and _any_array(args, kwargs):
+            return self._elemental(args, kwargs)
 
-        func_args = self._convert_args(*args, **kwargs)
+        # Everything for this call is kept local so calls can run in parallel
+        func_args, input_args, return_var = self._convert_args(*args, **kwargs)
 
-        with _captureStdOut() as cs:
-            if func_args is not None:
-                res = self._func(*func_args)
-            else:
-                res = self._func()
+        if self._actor is not None:
+            res = self._actor.run(self._call, func_args)
+        else:
+            res = self._call(func_args)
 
-        return self._convert_result(res, func_args)
+        return self._convert_result(res, func_args, input_args, return_var)
 
-    def _set_return(self):
-        if self.obj.is_subroutine():
-            self._func.restype = None  # Subroutine
-        else:
-            if (
-                self.return_var.obj.is_char()
-            ):  # Returning a character is done as a character + len at start of arg list
-                self._func.restype = None
-            else:
-                self._func.restype = self.return_var.ctype()
+    async def acall(self, *args, **kwargs):
+        """
+        Awaitable version of calling the procedure. The Fortran call runs on
+        the actor thread if there is one, otherwise on the event loop's
+        default executor, while the event loop carries on.
+        """
+        loop = asyncio.get_running_loop()
+        executor = None if self._actor is None else self._actor.executor
+
+        if self.plan.elemental and _any_array(args, kwargs):
+            return await loop.run_in_executor(executor, self._elemental, args, kwargs)
+
+        func_args, input_args, return_var = self._convert_args(*args, **kwargs)
+        res = await loop.run_in_executor(executor, self._call, func_args)
+        return self._convert_result(res, func_args, input_args, return_var)
 
-    def args_start(self):
+    def _call(self, func_args):
+        if self._stdout is not None or _TEST_FLAG:
+            with self._output():
+                return self._func(*func_args)
+        return self._func(*func_args)
+
+    def args_start(self, return_var):
         res = []
-        if self.obj.is_function():
-            if self.return_var.obj.is_char():
-                l = self.return_var.len()
-                res.append(self.return_var.from_param(" " * l))
-                res.append(self.return_var.ctype_len())
+        if self.plan.return_char:
+            l = return_var.len()
+            res.append(return_var.from_param(" " * l))
+            res.append(return_var.ctype_len())
 
         return res
 
     def args_check(self, *args, **kwargs):
-        count = 0
+        plan = self.plan
         arguments = []
-        # Build list of inputs
-        for fval in self.obj.args():
-            var = fVar(self._allobjs[fval.ref], allobjs=self._allobjs)
-
-            try:
-                x = kwargs[var.name]
-            except KeyError:
-                if count <= len(args):
-                    x = args[count]
-                    count = count + 1
-                else:
-                    raise TypeError("Not enough arguments passed")
-
-            if x is None and not var.obj.is_optional() and not var.obj.is_dummy():
-                raise ValueError(f"Got None for {var.name}")
+        # Build list of inputs, intent(out) arguments can be left out
+        for arg, x in zip(plan.args, plan.bind(args, kwargs, missing=_ALLOCATE)):
+            if x is _ALLOCATE and not arg.intent_out:
+                raise TypeError("Not enough arguments passed")
 
             if isinstance(x, fVar_t):
-                var = x
-                x = var.value
-
-            arguments.append(variable(x, var))
+                arguments.append(variable(x.value, x))
+            else:
+                var = arg.make(arg.obj, allobjs=plan.allobjs)
+                arguments.append(variable(x, var, arg.passing, arg.intent_out))
 
         return arguments
 
@@ -136,7 +310,13 @@ class fProc:
         args_end = []
         # Convert to ctypes
         for var in input_args:
-            _, a, e = var.fvar.to_proc(var.value)
+            if var.value is _ALLOCATE:
+                _, a, e = var.fvar.to_proc_out(None, var.passing)
+            elif var.intent_out and var.value is not None:
+                # Fortran sets it so there is nothing to copy in
+                _, a, e = var.fvar.to_proc_out(var.value, var.passing)
+            else:
+                _, a, e = var.fvar.to_proc(var.value, var.passing)
             args.append(a)
             if e is not None:
                 args_end.append(e)
@@ -144,40 +324,240 @@ class fProc:
         return args, args_end
 
     def _convert_args(self, *args, **kwargs):
-        args_start = self.args_start()
+        return_var = self.plan.new_return()
 
-        self.input_args = self.args_check(*args, **kwargs)
+        args_start = self.args_start(return_var)
 
-        args_mid, args_end = self.args_convert(self.input_args)
+        input_args = self.args_check(*args, **kwargs)
 
-        return args_start + args_mid + args_end
+        args_mid, args_end = self.args_convert(input_args)
 
-    def _convert_result(self, result, args):
-        res = {}
+        return args_start + args_mid + args_end, input_args, return_var
 
-        if self.obj.is_function():
-            if self.return_var.obj.is_char():
-                result = args[0]
-                _ = args.pop(0)
-                _ = args.pop(0)  # Twice to pop first and second value
-
-        if len(self.obj.args()):
-            for var in self.input_args:
-                try:
-                    x = ptr_unpack(var.fvar.value)
-                except AttributeError:  # unset optional arguments
-                    x = None
+    def _convert_result(self, result, args, input_args, return_var):
+        plan = self.plan
 
-                if hasattr(result, "_type_"):
-                    res[var.fvar.name] = var.fvar.from_ctype(x)
-                else:
-                    res[var.fvar.name] = x
+        if plan.return_char:
+            result = args[0]
 
-        if self.obj.is_function():
-            result = self.return_var.from_ctype(result)
+        res = {}
+        inputs = {}
+        for arg, var in zip(plan.args, input_args):
+            if arg.intent_in:
+                if self.drop_intent_in:
+                    continue
+                if not isinstance(var.value, fVar_t):
+                    # Fortran can not have changed it, hand back what was passed
+                    inputs[var.fvar.name] = var.value
+            res[var.fvar.name] = var.fvar
+
+        res = ResultArgs(res, hasattr(result, "_type_"), inputs)
+
+        if plan.return_convert is not None:
+            result = plan.return_convert(result)
+        elif plan.is_function:
+            result = return_var.from_ctype(result)
 
         return self.Result(result, res)
 
+    @contextlib.contextmanager
+    def _output(self):
+        # Capturing redirects stdout for the whole process, so calls that
+        # capture have to take turns
+        if self._stdout is not None:
+            with _capture_lock, StdoutCapture(self._stdout):
+                yield
+        elif _TEST_FLAG:
+            with _capture_lock, _captureStdOut():
+                yield
+        else:
+            yield
+
+    def map(self, iterable, workers=None):
+        """
+        Call the procedure once for each item of iterable on a pool of
+        threads, returning the results in order. Each item is either a dict
+        of keyword arguments or a sequence of positional arguments.
+
+        The Fortran code runs without the GIL so calls run in parallel, the
+        procedure must be safe to call from several threads at once (PURE
+        procedures are).
+        """
+
+        def call(item):
+            if isinstance(item, collections.abc.Mapping):
+                return self(**item)
+            return self(*item)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(call, iterable))
+
+    def batch(self, *args, **kwargs):
+        """
+        Call the procedure once for each row (the leading axis) of the array
+        arguments. Arguments given as a single value are passed unchanged to
+        every call, missing intent(out) arguments are allocated.
+
+        Only scalar and explicit shape array arguments can be batched. Returns
+        a Result where result is an array of the function results (None for
+        subroutines) and args holds the batched arguments after the calls.
+        """
+        plan = self.plan
+        return self._batch(
+            list(zip(plan.args, plan.bind(args, kwargs, missing=_ALLOCATE)))
+        )
+
+    def _batch(self, bound):
+        plan = self.plan
+        if plan.return_char:
+            raise NotImplementedError("Batched character functions not supported yet")
+
+        n = None
+        for arg, x in bound:
+            if x is not _ALLOCATE and self._batched(arg, x):
+                if n is None:
+                    n = len(x)
+                elif len(x) != n:
+                    raise ValueError(
+                        f"Batched arguments differ in length, got {len(x)} expected {n}"
+                    )
+        if n is None:
+            raise TypeError("No batched arguments passed")
+
+        columns = []
+        argtypes = []
+        ends = []
+        outputs = {}
+        keep = []  # The ctypes objects must live until the calls are done
+
+        for arg, x in bound:
+            if x is _ALLOCATE:
+                if not arg.intent_out:
+                    raise TypeError("Not enough arguments passed")
+                if arg.make not in (fScalar, fCmplx, fExplicitArr):
+                    raise NotImplementedError(f"Can not allocate {arg.name}")
+
+            if x is not _ALLOCATE and not self._batched(arg, x):
+                var = arg.make(arg.obj, allobjs=plan.allobjs)
+                _, a, e = var.to_proc(x, arg.passing)
+                keep.append(var)
+                columns.append(itertools.repeat(a))
+                argtypes.append(ctypes.c_void_p if a is None else type(a))
+                if e is not None:
+                    ends.append(e)
+                continue
+
+            work, rows = self._batch_array(arg, x, n)
+            if not (self.drop_intent_in and arg.intent_in):
+                outputs[arg.name] = rows
+
+            if arg.passing.depth == 1:
+                # Point straight at each row of the work array
+                base, step = work.ctypes.data, work.strides[0]
+                columns.append(range(base, base + n * step, step))
+                argtypes.append(ctypes.c_void_p)
+            elif arg.passing.depth == 0 and arg.make is fScalar:
+                columns.append(work.tolist())
+                argtypes.append(np.ctypeslib.as_ctypes_type(work.dtype))
+            else:
+                raise NotImplementedError(
+                    f"Can not batch {arg.name}, only scalars and explicit arrays"
+                )
+            keep.append(work)
+
+            if arg.passing.optional:
+                ends.append(ctypes.c_byte(1))
+
+        for e in ends:
+            columns.append(itertools.repeat(e))
+            argtypes.append(type(e))
+
+        restype = self._func.restype
+        func = ctypes.CFUNCTYPE(restype, *argtypes)(
+            ctypes.cast(self._func, ctypes.c_void_p).value
+        )
+
+        if self._actor is not None:
+            res = self._actor.run(self._starmap, func, columns)
+        else:
+            res = self._starmap(func, columns)
+
+        result = None
+        if plan.is_function:
+            robj = plan.return_obj
+            if issubclass(restype, ctypes._SimpleCData):
+                result = np.array(res, dtype=robj.dtype())
+                if robj.is_logical():
+                    result = result == 1
+            else:
+                rvar = plan.return_make(robj, allobjs=plan.allobjs)
+                result = np.array([rvar.from_ctype(r) for r in res])
+
+        for arg, x in bound:
+            if arg.obj.is_logical() and arg.name in outputs:
+                outputs[arg.name] = outputs[arg.name] == 1
+
+        return self.Result(result, outputs)
+
+    def _starmap(self, func, columns):
+        with self._output():
+            return list(itertools.starmap(func, zip(*columns)))
+
+    def _elemental(self, args, kwargs):
+        # Broadcast the arguments against each other then call once per element
+        plan = self.plan
+        bound = plan.bind(args, kwargs, missing=_ALLOCATE)
+        shape = np.broadcast_shapes(*(np.shape(x) for x in bound if x is not _ALLOCATE))
+
+        flat = []
+        for arg, x in zip(plan.args, bound):
+            if x is not _ALLOCATE and not (arg.intent_in and np.ndim(x) == 0):
+                x = np.reshape(np.broadcast_to(x, shape), -1)
+            flat.append((arg, x))
+
+        res = self._batch(flat)
+
+        result = res.result
+        if result is not None:
+            result = result.reshape(shape)
+
+        return self.Result(result, {k: v.reshape(shape) for k, v in res.args.items()})
+
+    def _batched(self, arg, x):
+        if arg.make is fExplicitArr:
+            return np.ndim(x) == arg.obj.ndim + 1
+        elif arg.make is fScalar or arg.make is fCmplx:
+            return np.ndim(x) == 1
+        return False
+
+    def _batch_array(self, arg, x, n):
+        # Returns a C ordered work array with one Fortran ordered row per call
+        # and a (n, *shape) view of it
+        dtype = arg.obj.dtype()
+        if arg.make is fExplicitArr:
+            shape = tuple(arg.obj.shape())
+            perm = (0,) + tuple(range(len(shape), 0, -1))
+        else:
+            shape = ()
+            perm = (0,)
+
+        if x is _ALLOCATE:
+            work = np.zeros((n,) + shape[::-1], dtype=dtype)
+        else:
+            x = np.asarray(x)
+            if x.shape[1:] != shape:
+                raise ValueError(
+                    f"Wrong shape for {arg.name}, got {x.shape[1:]} expected {shape}"
+                )
+            x = np.transpose(x, perm)
+            if arg.intent_in:
+                # Fortran won't write to it, so only copy if we have to
+                work = np.ascontiguousarray(x, dtype=dtype)
+            else:
+                work = np.array(x, dtype=dtype, order="C")
+
+        return work, np.transpose(work, perm)
+
     def __repr__(self):
         return self.__doc__
 
@@ -203,6 +583,30 @@ class fProc:
             )
         return self._return_value
 
+    @property
+    def return_obj(self):
+        return self._allobjs[self.obj.return_arg()]
+
+
+def _simple_return(obj, make):
+    # ctypes already hands back a python number for these, so skip the fVar
+    if make is not fScalar or obj.is_array():
+        return None
+    if obj.type() == "INTEGER":
+        return int
+    elif obj.type() == "REAL" and obj.kind() in (4, 8):
+        return float
+    elif obj.type() == "LOGICAL":
+        return lambda x: x == 1
+    return None
+
+
+def _any_array(args, kwargs):
+    for x in itertools.chain(args, kwargs.values()):
+        if isinstance(x, (np.ndarray, list, tuple)) and np.ndim(x) > 0:
+            return True
+    return False
+
 
 def ptr_unpack(ptr):
     x = ptr
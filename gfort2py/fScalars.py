@@ -1,4 +1,5 @@
 import ctypes
+import numpy as np
 
 from .fVar_t import fVar_t
 
@@ -29,6 +30,14 @@ class fScalar(fVar_t):
     def value(self, value):
         self.from_param(value)
 
+    def view(self):
+        # A 0-d array, logicals are seen as their underlying integer
+        if getattr(self, "_view", None) is None:
+            if self.kind == 16:
+                raise NotImplementedError(f"Quad precision floats not supported yet")
+            self._view = np.ctypeslib.as_array(self.cvalue)
+        return self._view
+
     def sizeof(self):
         return ctypes.sizeof(self.ctype)
 
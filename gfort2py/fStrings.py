@@ -1,6 +1,7 @@
 import ctypes
 
 from .fVar_t import fVar_t
+from . import ctype_cache
 
 
 class fStr(fVar_t):
@@ -9,7 +10,7 @@ class fStr(fVar_t):
         self._len = None
 
     def ctype(self):
-        return self._ctype_base * self.len()
+        return ctype_cache.array(self._ctype_base, self.len())
 
     def from_param(self, value):
         if self.obj.is_deferred_len():
@@ -55,6 +56,16 @@ class fStr(fVar_t):
     def ctype_len(self, *args):
         return ctypes.c_int64(self.len())
 
+    def allocate(self, like=None):
+        if self.obj.is_deferred_len():
+            if like is None:
+                raise TypeError(
+                    f"Can not allocate {self.name} without knowing its length"
+                )
+            self._len = len(like)
+        self.cvalue = self.ctype()()
+        return self.cvalue
+
     def __doc__(self):
         try:
             return f"{self.type}(LEN={self.obj.strlen}) :: {self.name}"
@@ -76,11 +87,11 @@ class fAllocStr(fStr):
 
     @property
     def _ctype_base(self):
-        return ctypes.c_char_p * self.len()
+        return ctype_cache.array(ctypes.c_char_p, self.len())
 
     @_ctype_base.setter
     def _ctype_base(self, value):
-        return ctypes.c_char_p * self.len()
+        return ctype_cache.array(ctypes.c_char_p, self.len())
 
     def from_param(self, value):
         if value is None:
@@ -141,7 +152,11 @@ class fAllocStr(fStr):
     def sizeof(self):
         return ctypes.sizeof(self.ctype)
 
-    def to_proc(self, value):
+    def to_proc_out(self, value=None, passing=None):
+        # Fortran allocates it
+        return self.to_proc(None, passing)
+
+    def to_proc(self, value, passing=None):
         if value is None:
             l = 0
         else:
@@ -21,8 +21,8 @@ default_ops = {
     'GT' : operator.__gt__,
     'GE_SIGN': operator.__ge__,
     'GE': operator.__ge__,
-    'LT_SIGN': operator.__le__,
-    'LT': operator.__le__,
+    'LT_SIGN': operator.__lt__,
+    'LT': operator.__lt__,
     'LE_SIGN': operator.__le__,
     'LE': operator.__le__,
     'NOT': operator.__not__,
@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: GPL-2.0+
 import ctypes
+import functools
 import numpy as np
 
 from .fVar_t import fVar_t
@@ -13,32 +14,40 @@ from .fProcPtr import fProcPointer
 
 class fVar:
     def __new__(cls, obj, *args, **kwargs):
+        return cls.resolve(obj)(obj, *args, **kwargs)
+
+    @classmethod
+    def resolve(cls, obj):
+        """
+        Returns the class (or partial) that builds the fVar_t for obj,
+        so callers that make many fVar's for the same obj only dispatch once
+        """
         if obj.is_derived():
             if obj.is_array():
                 if obj.is_explicit():
-                    return fExplicitDT(obj, fVar, *args, **kwargs)
+                    return functools.partial(fExplicitDT, fvar=fVar)
                 raise NotImplementedError
             else:
-                return fDT(obj, fVar, *args, **kwargs)
+                return functools.partial(fDT, fvar=fVar)
         elif obj.is_proc_pointer():
             raise NotImplementedError
-            # return fProcPointer(obj, *args, **kwargs)
+            # return fProcPointer
         elif obj.is_array():
             if obj.is_explicit():
-                return fExplicitArr(obj, *args, **kwargs)
+                return fExplicitArr
             elif obj.is_assumed_size():
-                return fAssumedSize(obj, *args, **kwargs)
+                return fAssumedSize
             elif obj.is_assumed_shape() or obj.is_allocatable() or obj.is_pointer():
-                return fAssumedShape(obj, *args, **kwargs)
+                return fAssumedShape
             else:
                 raise TypeError("Unknown array type")
         else:
             if obj.is_char():
                 if obj.is_allocatable():
-                    return fAllocStr(obj, *args, **kwargs)
+                    return fAllocStr
                 else:
-                    return fStr(obj, *args, **kwargs)
+                    return fStr
             elif obj.is_complex():
-                return fCmplx(obj, *args, **kwargs)
+                return fCmplx
             else:
-                return fScalar(obj, *args, **kwargs)
+                return fScalar
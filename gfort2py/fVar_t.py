@@ -1,6 +1,10 @@
 import ctypes
 import collections
 
+from . import ctype_cache
+
+Passing = collections.namedtuple("Passing", ["optional", "depth", "deferred_len"])
+
 
 class fVar_t:
     Args = collections.namedtuple("arg", ["prepend", "arg", "append"])
@@ -37,6 +41,9 @@ class fVar_t:
             # Do it this way so we get the conversion code in value called (i.e decodeing bytes to a string)
         return self.value
 
+    def view(self):
+        raise TypeError(f"Can not make a view of {self.name}")
+
     def from_address(self, addr):
         self.cvalue = self.ctype().from_address(addr)
         return self.cvalue
@@ -45,32 +52,72 @@ class fVar_t:
         self.cvalue = self.ctype().in_dll(lib, self.mangled_name)
         return self.cvalue
 
-    def to_proc(self, value):
+    @staticmethod
+    def passing(obj):
+        """
+        How obj is passed to a procedure, this only depends on the symbol so
+        can be worked out once and handed back to to_proc on each call
+        """
+        if obj.is_value():
+            depth = 0
+        elif obj.is_pointer() and not obj.not_a_pointer():
+            depth = 2
+        else:
+            depth = 1
+
+        return Passing(obj.is_optional(), depth, obj.is_deferred_len())
+
+    def to_proc(self, value, passing=None):
+        if passing is None:
+            passing = self.passing(self.obj)
+
         start = None
         arg = None
         end = None
 
-        if self.obj.is_optional() and value is None:
+        if passing.optional and value is None:
             end = ctypes.c_byte(0)
             arg = None
             return self.Args(start, arg, end)
 
-        raw_arg = self.from_param(value)
-        if self.obj.is_optional():
+        return self._pass(self.from_param(value), value, passing)
+
+    def to_proc_out(self, value=None, passing=None):
+        """
+        As to_proc but for an intent(out) argument, the storage is set up
+        without copying value in (value may be None, otherwise it can give
+        the size of the storage)
+        """
+        if passing is None:
+            passing = self.passing(self.obj)
+
+        return self._pass(self.allocate(value), value, passing)
+
+    def allocate(self, like=None):
+        """
+        Storage for an intent(out) argument, Fortran sets the contents
+        """
+        if like is not None:
+            return self.from_param(like)
+        if self.cvalue is None:
+            self.cvalue = self.ctype()()
+        return self.cvalue
+
+    def _pass(self, raw_arg, value, passing):
+        start = None
+        end = None
+        if passing.optional:
             end = ctypes.c_byte(1)
 
-        if self.obj.is_value():
+        if passing.depth == 0:
             arg = raw_arg
         else:
-            if self.obj.is_pointer():
-                if self.obj.not_a_pointer():
-                    arg = ctypes.pointer(raw_arg)
-                else:
-                    arg = ctypes.pointer(ctypes.pointer(raw_arg))
+            if passing.depth == 2:
+                arg = ctypes.pointer(ctypes.pointer(raw_arg))
             else:
                 arg = ctypes.pointer(raw_arg)
 
-            if self.obj.is_deferred_len():
+            if passing.deferred_len:
                 end = self.ctype_len(value)
 
         return self.Args(start, arg, end)
@@ -108,12 +155,6 @@ def ctype_map(type, kind):
         else:
             raise TypeError("Complex type of kind={kind} not supported")
 
-        class complex(ctypes.Structure):
-            _fields_ = [
-                ("real", ct),
-                ("imag", ct),
-            ]
-
-        return complex
+        return ctype_cache.complex_type(ct)
     else:
         raise TypeError(f"Type={type} and kind={kind} not supported")
@@ -1,28 +1,81 @@
 # SPDX-License-Identifier: GPL-2.0+
 import ctypes
+import concurrent.futures
+import functools
+import glob
 import numpy as np
 import os
+import threading
 
-from .module_parse import module
+from .module_cache import load_module
 
 from .fVar import fVar
 from .fProc import fProc
 from .fParameters import fParam
+from .actor import Actor
 
 _TEST_FLAG = os.environ.get("_GFORT2PY_TEST_FLAG") is not None
 
+# Raised for symbols that can not be used from Python: unsupported types,
+# symbols missing from the library and so on
+_UNRESOLVABLE = (
+    NotImplementedError,
+    TypeError,
+    AttributeError,
+    ValueError,
+    RecursionError,
+)
+
 
 class fFort:
     _initialized = False
 
-    def __init__(self, libname, mod_file):
-        self._lib = ctypes.CDLL(libname)
+    def __init__(
+        self,
+        libname,
+        mod_file,
+        cache_dir=None,
+        lazy=False,
+        stdout=None,
+        drop_intent_in=False,
+        actor=False,
+    ):
+        self._setup(
+            ctypes.CDLL(libname),
+            mod_file,
+            load_module(mod_file, cache_dir, lazy=lazy),
+            stdout=stdout,
+            drop_intent_in=drop_intent_in,
+            actor=actor,
+        )
+
+    def _setup(self, lib, mod_file, module, **proc_options):
+        self._lib = lib
         self._mod_file = mod_file
-        self._module = module(self._mod_file)
+        self._module = module
+
+        # actor is either a bool or an Actor to share with other modules
+        actor = proc_options.get("actor")
+        if actor is True:
+            actor = Actor(f"gfort2py-{os.path.basename(module.filename)}")
+        proc_options["actor"] = actor or None
+        # Passed on to every fProc
+        self._proc_options = proc_options
 
         self._saved = {}
+        self._unresolved = {}
+        self._lock = threading.RLock()
         self._initialized = True
 
+    @classmethod
+    def from_module(cls, lib, module, **proc_options):
+        """
+        Build from an already loaded library and parsed module
+        """
+        self = cls.__new__(cls)
+        self._setup(lib, module.filename, module, **proc_options)
+        return self
+
     def keys(self):
         return self._module.keys()
 
@@ -42,44 +95,146 @@ class fFort:
                     raise AttributeError(f"{self._mod_file}  has no attribute {key}")
 
             if self._module[key].is_variable():
-                if key not in self._saved:
-                    self._saved[key] = fVar(self._module[key], allobjs=self._module)
-                self._saved[key].in_dll(self._lib)
-                return self._saved[key].value
+                return self._variable(key).value
             elif self._module[key].is_proc_pointer():
                 # Must come before fProc
-                if key not in self._saved:
-                    self._saved[key] = fVar(self._module[key], allobjs=self._module)
-                return self._saved[key]
+                return self._proc_pointer(key)
             elif self._module[key].is_procedure():
-                return fProc(self._lib, self._module[key], self._module)
+                return self._materialise(key, self._proc)
             elif self._module[key].is_parameter():
-                return fParam(self._module[key]).value
+                return self._materialise(key, lambda obj: fParam(obj).value)
             else:
                 raise NotImplementedError(
                     f"Object type {self._module[key].flavor()} not implemented yet"
                 )
 
-    def __setattr__(self, key, value):
-        if key in self.__dict__:
-            self.__dict__[key] = value
-            return
+    def _variable(self, key):
+        # The symbol address never changes so only look it up once
+        try:
+            return self._saved[key]
+        except KeyError:
+            pass
 
-        if "_initialized" in self.__dict__:
+        with self._lock:
+            if key not in self._saved:
+                var = fVar(self._module[key], allobjs=self._module)
+                var.in_dll(self._lib)
+                self._saved[key] = var
+            return self._saved[key]
+
+    def _proc_pointer(self, key):
+        with self._lock:
+            if key not in self._saved:
+                self._saved[key] = fVar(self._module[key], allobjs=self._module)
+            return self._saved[key]
+
+    def view(self, key):
+        """
+        Returns a numpy array that shares memory with the module variable key,
+        changes made on either side are seen by the other.
+
+        For allocatable and pointer arrays the array is remapped if Fortran
+        has (re)allocated it since the last call, and is None while unallocated.
+        """
+        if key not in self.keys():
+            raise AttributeError(f"{self._mod_file}  has no attribute {key}")
+        if not self._module[key].is_variable():
+            raise TypeError(f"{key} is not a module variable")
+
+        return self._variable(key).view()
+
+    def allocate(self, key, shape, fill=None):
+        """
+        Allocates the allocatable module array key with malloc, as Fortran
+        would, so Fortran owns the memory and may deallocate or reallocate it.
+        Any previous allocation is freed. The array is zero filled, or set
+        to fill, and a view of it is returned.
+        """
+        return self._allocatable(key).malloc(shape, fill=fill)
+
+    def adopt(self, key):
+        """
+        Hands the allocatable module array key over to numpy without copying.
+        The returned array owns the memory, which is freed once no array
+        uses it, and the Fortran variable is left unallocated. Returns None
+        if key is not allocated.
+        """
+        return self._allocatable(key).adopt()
+
+    def _allocatable(self, key):
+        if key not in self.keys():
+            raise AttributeError(f"{self._mod_file}  has no attribute {key}")
+        obj = self._module[key]
+        if not (obj.is_variable() and obj.is_allocatable() and obj.is_array()):
+            raise TypeError(f"{key} is not an allocatable module array")
+
+        return self._variable(key)
+
+    def _proc(self, obj):
+        return fProc(self._lib, obj, self._module, **self._proc_options)
+
+    def _materialise(self, key, make):
+        # Procedures and parameters never change so store them on the
+        # instance, later lookups then never reach __getattr__. Names that
+        # clash with methods are left to __getattr__ each time.
+        with self._lock:
+            if key in self.__dict__:
+                return self.__dict__[key]
+
+            value = make(self._module[key])
+            if not hasattr(type(self), key):
+                self.__dict__[key] = value
+            return value
+
+    def resolve_all(self):
+        """
+        Resolve every procedure, parameter and variable now rather than on
+        first access. Compiler generated symbols are skipped, symbols that
+        can not be resolved are left out and listed in unresolved.
+        """
+        unresolved = {}
+        for key in self.keys():
+            if key.startswith("__"):
+                continue
+            try:
+                self._resolve(key)
+            except _UNRESOLVABLE as e:
+                unresolved[key] = e
+        self._unresolved = unresolved
+        return self
+
+    def _resolve(self, key):
+        obj = self._module[key]
+        if obj.is_proc_pointer():
+            self._proc_pointer(key)
+        elif obj.is_variable():
+            self._variable(key)
+        elif obj.is_procedure():
+            self._materialise(key, self._proc).plan
+        elif obj.is_parameter():
+            self._materialise(key, lambda obj: fParam(obj).value)
+
+    @property
+    def unresolved(self):
+        """
+        The symbols the last resolve_all could not resolve, with the
+        exception each raised
+        """
+        return dict(self._unresolved)
+
+    def __setattr__(self, key, value):
+        if "_initialized" in self.__dict__ and key in self._module.keys():
             if self._initialized:
                 if self._module[key].is_variable():
-                    if key not in self._saved:
-                        self._saved[key] = fVar(self._module[key], allobjs=self._module)
-                    self._saved[key].in_dll(self._lib)
-                    self._saved[key].value = value
+                    self._variable(key).value = value
                     return
                 elif self._module[key].is_parameter():
                     raise AttributeError("Can not alter a parameter")
                 elif self._module[key].is_proc_pointer():
-                    if key not in self._saved:
-                        self._saved[key] = fVar(self._module[key], allobjs=self._module)
-                    self._saved[key].value = value
+                    self._proc_pointer(key).value = value
                     return
+                elif self._module[key].is_procedure():
+                    raise AttributeError("Can not alter a procedure")
                 else:
                     raise NotImplementedError(
                         f"Object type {self._module[key].flavor()} not implemented yet"
@@ -95,5 +250,133 @@ class fFort:
         return f"{self._module.filename}"
 
 
-def mod_info(mod_file):
-    return module(mod_file)
+class fProject:
+    """
+    All the modules of one shared library under a single namespace.
+
+    mod_files is either a directory (all *.mod files inside are used) or a
+    list of .mod files. Modules are parsed in parallel in a process pool of
+    size workers (default is one per core), each module is accessible as
+    an attribute by its name and every module symbol is accessible directly.
+    """
+
+    _initialized = False
+
+    def __init__(
+        self,
+        libname,
+        mod_files,
+        workers=None,
+        cache_dir=None,
+        lazy=True,
+        stdout=None,
+        drop_intent_in=False,
+        actor=False,
+    ):
+        self._lib = ctypes.CDLL(libname)
+
+        if isinstance(mod_files, (str, os.PathLike)):
+            if os.path.isdir(mod_files):
+                mod_files = sorted(glob.glob(os.path.join(mod_files, "*.mod")))
+            else:
+                mod_files = [mod_files]
+        self._mod_files = list(mod_files)
+
+        load = functools.partial(load_module, cache=cache_dir, lazy=lazy)
+        if workers == 1 or len(self._mod_files) < 2:
+            modules = list(map(load, self._mod_files))
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                modules = list(pool.map(load, self._mod_files))
+
+        if actor is True:
+            # Shared by every module, it is the library that is not re-entrant
+            actor = Actor(f"gfort2py-{os.path.basename(libname)}")
+
+        self._modules = {}
+        self._symbols = {}
+        for filename, mod in zip(self._mod_files, modules):
+            name = os.path.splitext(os.path.basename(filename))[0]
+            self._modules[name] = fFort.from_module(
+                self._lib,
+                mod,
+                stdout=stdout,
+                drop_intent_in=drop_intent_in,
+                actor=actor,
+            )
+            # Used symbols appear in several modules but they all mangle to
+            # the defining module, so the first one seen is as good as any
+            for key in mod.keys():
+                self._symbols.setdefault(key, name)
+
+        self._unresolved = {}
+        self._initialized = True
+
+    @property
+    def modules(self):
+        return dict(self._modules)
+
+    def keys(self):
+        return self._symbols.keys()
+
+    def __contains__(self, key):
+        return key in self._symbols or key in self._modules
+
+    def __dir__(self):
+        return list(self._modules.keys()) + list(self._symbols.keys())
+
+    def __getitem__(self, key):
+        return self._modules[key]
+
+    def __getattr__(self, key):
+        if "_initialized" in self.__dict__:
+            if key in self._modules:
+                return self._modules[key]
+            if key in self._symbols:
+                mod = self._modules[self._symbols[key]]
+                value = getattr(mod, key)
+                if key in mod.__dict__ and not hasattr(type(self), key):
+                    self.__dict__[key] = value
+                return value
+
+        raise AttributeError(f"Project has no attribute {key}")
+
+    def resolve_all(self):
+        """
+        Resolve every symbol in every module now rather than on first access,
+        symbols that can not be resolved are listed in unresolved
+        """
+        unresolved = {}
+        for mod in self._modules.values():
+            mod.resolve_all()
+            for key, e in mod.unresolved.items():
+                unresolved.setdefault(key, e)
+        self._unresolved = unresolved
+        for key, name in self._symbols.items():
+            if key in self._modules[name].__dict__ and not hasattr(type(self), key):
+                self.__dict__[key] = self._modules[name].__dict__[key]
+        return self
+
+    @property
+    def unresolved(self):
+        """
+        The symbols the last resolve_all could not resolve, with the
+        exception each raised
+        """
+        return dict(self._unresolved)
+
+    def __setattr__(self, key, value):
+        if "_initialized" in self.__dict__:
+            if key in self._symbols:
+                # Goes to the module which raises for procedures and parameters
+                setattr(self._modules[self._symbols[key]], key, value)
+                return
+
+        self.__dict__[key] = value
+
+    def __str__(self):
+        return f"{', '.join(self._mod_files)}"
+
+
+def mod_info(mod_file, cache_dir=None, lazy=False):
+    return load_module(mod_file, cache_dir, lazy=lazy)
@@ -0,0 +1,80 @@
+# SPDX-License-Identifier: GPL-2.0+
+import hashlib
+import os
+import pickle
+import tempfile
+
+from .module_parse import module
+from . import version
+
+_CACHE_ENV = "GFORT2PY_CACHE_DIR"
+
+
+def cache_dir(path=None):
+    """
+    Returns the cache directory to use, either path or the
+    GFORT2PY_CACHE_DIR environment variable. None disables caching.
+    """
+    if path is None:
+        path = os.environ.get(_CACHE_ENV)
+    if not path:
+        return None
+    return os.path.expanduser(path)
+
+
+def cache_key(filename, lazy=False):
+    """
+    Key is built from the .mod contents, the module format version
+    and the gfort2py version so any of them changing misses the cache.
+    """
+    h = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+
+    h.update(f"module={module.version}".encode())
+    h.update(f"gfort2py={getattr(version, '__version__', 'unknown')}".encode())
+    h.update(f"lazy={bool(lazy)}".encode())
+    return h.hexdigest()
+
+
+def load_module(filename, cache=None, lazy=False):
+    """
+    Load a module, going via the on-disk cache if one is configured.
+
+    Entries are written to a temporary file and renamed into place so
+    concurrent processes sharing a cache never see a partial file.
+    Only point this at a directory you trust, the entries are pickles.
+    """
+    path = cache_dir(cache)
+    if path is None:
+        return module(filename, lazy=lazy)
+
+    entry = os.path.join(path, f"{cache_key(filename, lazy)}.pickle")
+
+    try:
+        with open(entry, "rb") as f:
+            mod = pickle.load(f)
+    except Exception:
+        # Missing, corrupt or written by an incompatible python, rebuild it
+        pass
+    else:
+        mod.filename = filename
+        return mod
+
+    mod = module(filename, lazy=lazy)
+
+    os.makedirs(path, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path, prefix=".tmp-", suffix=".pickle")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(mod, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, entry)
+    except OSError:
+        # Read only or full cache dir, carry on without caching
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+    return mod
@@ -1,15 +1,20 @@
 # SPDX-License-Identifier: GPL-2.0+
 
-from pyparsing import OneOrMore, nestedExpr
 from dataclasses import dataclass
 import numpy as np
+import collections.abc
 import gzip
+import os
+import re
 import sys
+import threading
 
 import pprint
 
 import typing as t
 
+from .fUnary import run_unary
+
 
 def string_clean(string):
     if string is None:
@@ -22,6 +27,20 @@ def string_clean(string):
     return string
 
 
+# Keeps the raw parse tree around for each symbol
+_DEBUG = os.environ.get("GFORT2PY_DEBUG") is not None
+
+_intern = sys.intern
+
+_attr_sets = {}
+
+
+def intern_set(items):
+    # Most symbols share one of a handful of attribute combinations
+    s = frozenset(_intern(i) for i in items)
+    return _attr_sets.setdefault(s, s)
+
+
 class VersionError(Exception):
     pass
 
@@ -119,21 +138,212 @@ class generics:
 
 def hextofloat(s):
     # Given hex like parameter '0.12decde@9' returns 5065465344.0
+    # The exponent is in powers of 16
     man, exp = s.split("@")
-    exp = int(exp)
-    decimal = man.index(".")
-    negative = man[0] == "-"
-    man = man[decimal + 1 :]
-    man = man.ljust(exp, "0")
-    man = man[:exp] + "." + man[exp:]
-    man = man + "P0"
-    if negative:
-        man = "-" + man
-    return float.fromhex(man)
+    if man[0] == "-":
+        return -float.fromhex(f"0x{man[1:]}p{4 * int(exp)}")
+    return float.fromhex(f"0x{man}p{4 * int(exp)}")
+
+
+# Value of each hex digit by character code, -1 for anything else
+_HEX_DIGITS = np.full(256, -1, dtype=np.int8)
+for _c in "0123456789abcdef":
+    _HEX_DIGITS[ord(_c)] = _HEX_DIGITS[ord(_c.upper())] = int(_c, 16)
+
+
+def _hextofloat_rows(chars, start, at):
+    """
+    Decode rows of '0.hex@exp' bytes that all start at column start and
+    have the @ at column at, returns the values and which rows were well
+    formed
+    """
+    n = len(chars)
+
+    # Mantissa, the hex digits between the 0. and the @
+    digits = _HEX_DIGITS[chars[:, start + 2 : at]]
+    ok = (chars[:, start] == ord("0")) & (chars[:, start + 1] == ord("."))
+    ok &= np.all(digits >= 0, axis=1)
+    mantissa = np.zeros(n, dtype=np.uint64)
+    for j in range(digits.shape[1]):
+        mantissa = (mantissa << np.uint64(4)) | digits[:, j].astype(np.uint64)
+
+    # Exponent, an optional minus then up to 6 decimal digits and the padding
+    exp = np.zeros((n, 8), dtype=np.uint8)
+    tail = chars[:, at + 1 : at + 9]
+    exp[:, : tail.shape[1]] = tail
+    exp_neg = exp[:, 0] == ord("-")
+    ok &= np.all(chars[:, at + 9 :] == 0, axis=1)
+    ok &= np.where(exp_neg, exp[:, 1], exp[:, 0]) != 0
+    ok &= np.where(exp_neg, exp[:, 7], exp[:, 6]) == 0
+    exponent = np.zeros(n, dtype=np.int64)
+    for j in range(6):
+        column = np.where(exp_neg, exp[:, j + 1], exp[:, j])
+        digit = column.astype(np.int64) - ord("0")
+        ok &= (column == 0) | ((digit >= 0) & (digit <= 9))
+        exponent = np.where(column != 0, 10 * exponent + digit, exponent)
+    exponent = np.where(exp_neg, -exponent, exponent)
+
+    values = np.ldexp(mantissa.astype(np.float64), 4 * (exponent - (at - start - 2)))
+    return values, ok
+
+
+def hextofloat_array(strings):
+    """
+    hextofloat for a list of strings at once, as a float64 array.
+
+    Regular '[-]0.hex@exp' strings with up to 16 hex digits are decoded
+    together with numpy, anything else goes through hextofloat.
+    """
+    n = len(strings)
+    values = np.zeros(n)
+    regular = np.zeros(n, dtype=bool)
+    if n == 0:
+        return values
+
+    # One row of bytes per string, NUL padded
+    chars = np.array(strings, dtype=bytes)
+    chars = chars.view(np.uint8).reshape(n, chars.dtype.itemsize)
+
+    neg = chars[:, 0] == ord("-")
+    for start in (0, 1):
+        pending = np.flatnonzero(neg == start)
+
+        # Values of one kind all have the same number of digits, so decode
+        # together the rows with the @ in the same place as the first one
+        while len(pending):
+            at = strings[pending[0]].find("@")
+            if not start + 2 < at <= start + 18:
+                pending = pending[1:]
+                continue
+            match = chars[pending, at] == ord("@")
+            rows = pending[match]
+            values[rows], regular[rows] = _hextofloat_rows(chars[rows], start, at)
+            pending = pending[~match]
+
+    values = np.where(neg, -values, values)
+    for i in np.flatnonzero(~regular):
+        values[i] = hextofloat(strings[i])
+
+    return values
+
+
+_array_dtypes = {
+    ("INTEGER", 4): "i4",
+    ("INTEGER", 8): "i8",
+    ("REAL", 4): "f4",
+    ("REAL", 8): "f8",
+    ("COMPLEX", 4): "c8",
+    ("COMPLEX", 8): "c16",
+}
+
+
+def decode_array(items, ts):
+    """
+    Decode the elements of an ARRAY constant straight into a read-only
+    numpy array, without building an expression for every element.
+
+    Returns None if the elements are not all simple constants of a type
+    numpy can hold, in which case the caller should decode element by element.
+    """
+    try:
+        dtype = _array_dtypes[(ts.type, ts.kind)]
+    except KeyError:
+        return None
+
+    # Each item looks like ((CONSTANT (ts) rank 'value' ()) ())
+    try:
+        values = [i[0][3][1:-1] for i in items if i[0][0] == "CONSTANT"]
+        if len(values) != len(items):
+            return None
+
+        if ts.type == "INTEGER":
+            res = np.array(list(map(int, values)), dtype=dtype)
+        elif ts.type == "REAL":
+            res = hextofloat_array(values).astype(dtype)
+        else:
+            res = np.empty(len(items), dtype=dtype)
+            res.real = hextofloat_array(values)
+            res.imag = hextofloat_array([i[0][4][1:-1] for i in items])
+    except (IndexError, ValueError, OverflowError):
+        return None
+
+    res.flags.writeable = False
+    return res
 
 
 #####################################
 
+# Tokens in a .mod file are parentheses, quoted strings (with the quote
+# character escaped by doubling it) or bare atoms. A lone quote character
+# only matches when a string is not yet terminated in the current buffer.
+_TOKEN_RE = re.compile(r"""[()]|'(?:[^']|'')*'|"(?:[^"]|"")*"|[^()\s'"]+|['"]""")
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def tokenize(stream, chunk_size=_CHUNK_SIZE):
+    """
+    Yields lists of tokens read incrementally from a text stream.
+
+    Chunks are split on the last newline so that atoms are never cut
+    in half, if a string is left open we keep reading until it closes.
+    """
+    carry = ""
+    while True:
+        chunk = stream.read(chunk_size)
+        buf = carry + chunk
+        if not chunk:
+            if buf:
+                yield _TOKEN_RE.findall(buf.replace("\n", " "))
+            return
+
+        cut = buf.rfind("\n") + 1
+        if cut == 0:
+            carry = buf
+            continue
+
+        tokens = _TOKEN_RE.findall(buf[:cut].replace("\n", " "))
+        if "'" in tokens or '"' in tokens:
+            # Unterminated string, wait for more data
+            carry = buf
+            continue
+
+        carry = buf[cut:]
+        yield tokens
+
+
+def parse_sexpr(stream, chunk_size=_CHUNK_SIZE):
+    """
+    Parse the s-expressions in a .mod file body into nested lists of strings.
+
+    Each top level group becomes one item of the returned list, matching
+    the layout that pyparsing's OneOrMore(nestedExpr()) used to produce.
+    """
+    result = []
+    stack = []
+    current = result
+    for tokens in tokenize(stream, chunk_size):
+        append = current.append
+        for tok in tokens:
+            if tok == "(":
+                new = []
+                append(new)
+                stack.append(current)
+                current = new
+                append = new.append
+            elif tok == ")":
+                if not stack:
+                    raise ValueError("Unbalanced parentheses in module file")
+                current = stack.pop()
+                append = current.append
+            else:
+                append(tok)
+
+    if stack:
+        raise ValueError("Unbalanced parentheses in module file")
+
+    return result
+
 
 def print_args(x):
     print()
@@ -143,6 +353,8 @@ def print_args(x):
 
 
 class utils:
+    __slots__ = ()
+
     def shape(self):
         if self.is_array():
             return self.sym.array_spec.pyshape
@@ -165,9 +377,9 @@ class utils:
                 return "f8"
         elif t == "COMPLEX":
             if k == 4:
-                return "c4"
-            elif k == 8:
                 return "c8"
+            elif k == 8:
+                return "c16"
 
         raise NotImplementedError(f"Object of type {t} and kind {k} not supported yet")
 
@@ -195,6 +407,15 @@ class utils:
     def is_optional(self):
         return "OPTIONAL" in self.sym.attr.attributes
 
+    def intent(self):
+        return self.sym.attr.intent
+
+    def is_intent_in(self):
+        return self.intent() == "IN"
+
+    def is_intent_out(self):
+        return self.intent() == "OUT"
+
     def is_optional_value(self):
         return self.is_optional() and self.is_value()
 
@@ -225,6 +446,9 @@ class utils:
     def is_array(self):
         return "DIMENSION" in self.sym.attr.attributes
 
+    def is_elemental(self):
+        return "ELEMENTAL" in self.sym.attr.attributes
+
     def is_always_explicit(self):
         return "ALWAYS_EXPLICIT" in self.sym.attr.attributes
 
@@ -298,11 +522,10 @@ class utils:
 
     def value(self):
         if self.is_parameter():
-            v = self.sym.parameter.value
             if not self.is_array():
-                return v
+                return self.sym.parameter.value
             else:
-                return np.array(v, dtype=self.dtype()).reshape(self.shape(), order="F")
+                return self.sym.parameter.as_array(self.dtype(), self.shape())
         else:
             raise AttributeError("Not a parameter")
 
@@ -328,29 +551,40 @@ class utils:
 
 @dataclass(init=False)
 class attribute:
-    flavor: str = ""
-    intent: str = ""
-    proc: str = ""
-    if_source: str = ""
-    save: str = ""
-    ext_attr: int = -1
-    extension: int = -1
-    attributes: t.Set[str] = None
+    __slots__ = (
+        "flavor",
+        "intent",
+        "proc",
+        "if_source",
+        "save",
+        "ext_attr",
+        "extension",
+        "attributes",
+    )
+    flavor: str
+    intent: str
+    proc: str
+    if_source: str
+    save: str
+    ext_attr: int
+    extension: int
+    attributes: t.FrozenSet[str]
 
     def __init__(self, *args):
-        self.flavor = string_clean(args[0])
-        self.intent = string_clean(args[1])
-        self.proc = string_clean(args[2])
-        self.if_source = string_clean(args[3])
-        self.save = string_clean(args[4])
+        self.flavor = _intern(string_clean(args[0]))
+        self.intent = _intern(string_clean(args[1]))
+        self.proc = _intern(string_clean(args[2]))
+        self.if_source = _intern(string_clean(args[3]))
+        self.save = _intern(string_clean(args[4]))
         self.ext_attr = int(args[5])
         self.extension = int(args[6])
-        self.attributes = set([string_clean(i) for i in args[7:]])
+        self.attributes = intern_set(string_clean(i) for i in args[7:])
 
 
 @dataclass
 class namespace:
-    ref: int = -1
+    __slots__ = ("ref",)
+    ref: int
 
     def __post_init__(self):
         self.ref = symbol_ref(self.ref)
@@ -358,6 +592,7 @@ class namespace:
 
 @dataclass
 class header:
+    __slots__ = ("id", "name", "module", "bindc", "parent_id")
     id: int
     name: str  # If first letter is capitalized then its a dt
     module: str
@@ -368,7 +603,7 @@ class header:
         self.id = int(self.id)
         self.parent_id = int(self.parent_id)
         self.name = string_clean(self.name)
-        self.module = string_clean(self.module)
+        self.module = _intern(string_clean(self.module))
         self.bindc = len(string_clean(self.bindc)) > 0
 
     @property
@@ -379,7 +614,8 @@ class header:
 
 @dataclass
 class symbol_ref:
-    ref: int = -1
+    __slots__ = ("ref",)
+    ref: int
 
     def __post_init__(self):
         self.ref = int(self.ref)
@@ -387,7 +623,8 @@ class symbol_ref:
 
 @dataclass(init=False)
 class formal_arglist:
-    symbol: t.List[symbol_ref] = None
+    __slots__ = ("symbol",)
+    symbol: t.List[symbol_ref]
 
     def __init__(self, *args):
         self.symbol = []
@@ -453,29 +690,43 @@ class actual_arglist:
 
 @dataclass(init=False)
 class typespec:
-    type: str = ""
-    kind: int = -1  # If class symbol_ref else kind
-    class_ref: symbol_ref = None  # If class/derived type symbol_ref else kind
-    interface: symbol_ref = None
-    is_c_interop: int = -1
-    is_iso_c: int = -1
-    type2: str = ""  # Repeat of type
-    charlen: int = -1  # If character
-    deferred_cl: bool = False  # if character and deferred length
+    __slots__ = (
+        "type",
+        "kind",
+        "class_ref",
+        "interface",
+        "is_c_interop",
+        "is_iso_c",
+        "type2",
+        "charlen",
+        "deferred_cl",
+    )
+    type: str
+    kind: int  # If class symbol_ref else kind
+    class_ref: symbol_ref  # If class/derived type symbol_ref else kind
+    interface: symbol_ref
+    is_c_interop: int
+    is_iso_c: int
+    type2: str  # Repeat of type
+    charlen: int  # If character
+    deferred_cl: bool  # if character and deferred length
 
     def __init__(self, *args):
-        self.type = args[0]
+        self.type = _intern(args[0])
+        self.kind = -1
+        self.class_ref = None
         if self.type == "CLASS" or self.type == "DERIVED":
             self.class_ref = symbol_ref(args[1])
         else:
             self.kind = int(args[1])
 
+        self.interface = None
         if len(args[2]):
             self.interface = symbol_ref(args[2])
 
         self.is_c_interop = bool(int(args[3]))
         self.is_iso_c = bool(int(args[4]))
-        self.type2 = args[5]
+        self.type2 = _intern(args[5])
         try:
             self.charlen = expression(
                 *args[6][0]
@@ -490,24 +741,45 @@ class typespec:
 
 @dataclass(init=False)
 class expression:
-    exp_type: str = ""
-    ts: typespec = None
-    rank: int = -1
-    value: t.Any = None
-    arglist: actual_arglist = None  # PDT's?
-    charlen: int = -1
-    unary_op: str = ""
+    __slots__ = (
+        "exp_type",
+        "ts",
+        "rank",
+        "value",
+        "arglist",
+        "charlen",
+        "unary_op",
+        "unary_args",
+        "_unknown",
+        "_array",
+    )
+    exp_type: str
+    ts: typespec
+    rank: int
+    value: t.Any
+    arglist: actual_arglist  # PDT's?
+    charlen: int
+    unary_op: str
 
     def __init__(self, *args):
-        self.exp_type = args[0]
+        self.exp_type = _intern(args[0])
         self.ts = typespec(*args[1])
         self.rank = int(args[2])
+        self.value = None
+        self.arglist = None
+        self.charlen = -1
+        self.unary_op = ""
+        self.unary_args = None
+        self._unknown = None
+        self._array = None
 
         if self.exp_type == "OP":
-            self.value = None
-            self.unary_op = args[3]
-            self.unary_args = [expression(*args[4]), expression(*args[5])]
-            self._unknown = args[6]  # What is this for?
+            # Unary ops only have one operand followed by an empty ()
+            self.unary_op = _intern(args[3])
+            self.unary_args = [expression(*i) for i in args[4:6] if len(i)]
+            if len(args) > 6:
+                self._unknown = args[6]  # What is this for?
+            self.value = self._fold()
         elif self.exp_type == "FUNCTION":
             self.value = symbol_ref(args[3])
         elif self.exp_type == "CONSTANT":
@@ -529,11 +801,13 @@ class expression:
         elif self.exp_type == "SUBSTRING":
             raise NotImplementedError(args)
         elif self.exp_type == "ARRAY":
-            self.value = []
-            for i in args[3]:
-                self.value.append(
-                    expression(*i[0]).value
-                )  # Wheres the extra component comming from?
+            self.value = decode_array(args[3], self.ts)
+            if self.value is None:
+                self.value = []
+                for i in args[3]:
+                    self.value.append(
+                        expression(*i[0]).value
+                    )  # Wheres the extra component comming from?
         elif self.exp_type == "NULL":
             self.value = args[3]
         elif self.exp_type == "COMPCALL":
@@ -543,22 +817,78 @@ class expression:
         else:
             raise AttributeError(f"Can't match {self.exp_type}")
 
+    def _fold(self):
+        # Evaluate OP's whose operands are all constants, else returns None
+        values = []
+        for i in self.unary_args:
+            if i.value is None or isinstance(i.value, symbol_ref):
+                return None
+            values.append(i.value)
+
+        op = self.unary_op
+        if len(values) == 1:
+            if op == "PARENTHESES":
+                return values[0]
+            elif op == "NOT":
+                return not values[0]
+            elif op == "UMINUS" or op == "UPLUS":
+                values = [0] + values
+            else:
+                return None
+
+        try:
+            if op == "DIVIDE" and all(type(i) is int for i in values):
+                # Fortran integer division truncates towards zero, done in
+                # integers as kind=8 values do not survive a float
+                a, b = values
+                value = abs(a) // abs(b)
+                if (a < 0) != (b < 0):
+                    value = -value
+            else:
+                value = run_unary(op, *values)
+        except (NotImplementedError, KeyError, TypeError, ArithmeticError):
+            return None
+
+        if self.ts.type == "INTEGER" and isinstance(value, float):
+            # Say 2**-1
+            value = int(value)
+
+        return value
+
+    def as_array(self, dtype, shape):
+        """
+        Value of an ARRAY constant as a read-only array of the
+        given dtype and shape, built once and then cached
+        """
+        if self._array is None:
+            arr = np.asarray(self.value, dtype=dtype).reshape(shape, order="F")
+            arr.flags.writeable = False
+            self._array = arr
+        return self._array
+
 
 @dataclass(init=False)
 class arrayspec:
-    rank: int = -1
-    corank: int = -1
-    array_type: str = ""
-    lower: t.List[expression] = None
-    upper: t.List[expression] = None
+    __slots__ = ("rank", "corank", "array_type", "lower", "upper")
+    rank: int
+    corank: int
+    array_type: str
+    lower: t.List[expression]
+    upper: t.List[expression]
 
     def __init__(self, *args):
+        self.rank = -1
+        self.corank = -1
+        self.array_type = ""
+        self.lower = None
+        self.upper = None
+
         if not len(args):
             return
 
         self.rank = int(args[0])
         self.corank = int(args[1])
-        self.array_type = args[2]
+        self.array_type = _intern(args[2])
         self.lower = []
         self.upper = []
         for i in range(self.rank + self.corank):
@@ -593,16 +923,29 @@ class arrayspec:
 
 @dataclass(init=False)
 class component(utils):
-    id: int = -1
-    name: str = ""
-    ts: typespec = None
-    array_spec: arrayspec = None
-    expr: expression = None
-    actual_arg: actual_arglist = None
-    attr: attribute = None
-    access: str = ""
-    initializer: expression = None
-    proc_ptr: typebound_proc = None
+    __slots__ = (
+        "id",
+        "name",
+        "ts",
+        "array_spec",
+        "expr",
+        "actual_arg",
+        "attr",
+        "access",
+        "initializer",
+        "proc_ptr",
+        "sym",
+    )
+    id: int
+    name: str
+    ts: typespec
+    array_spec: arrayspec
+    expr: expression
+    actual_arg: actual_arglist
+    attr: attribute
+    access: str
+    initializer: expression
+    proc_ptr: typebound_proc
 
     def __init__(self, *args):
         args = list(args)
@@ -611,17 +954,21 @@ class component(utils):
         self.name = string_clean(args[1])
         self.ts = typespec(*args[2])
         self.array_spec = arrayspec(*args[3])
+        self.expr = None
         if len(args[4]):
             self.expr = expression(*args[4])
+        self.actual_arg = None
         if len(args[5]):
             self.actual_arg = actual_arglist(*args[5])
         self.attr = attribute(*args[6])
-        self.access = string_clean(args[7])
+        self.access = _intern(string_clean(args[7]))
 
+        self.initializer = None
         if self.name == "_final" or self.name == "_hash":
             self.initializer = expression(*args[8])
             _ = args.pop(8)
 
+        self.proc_ptr = None
         if not self.attr.proc == "UNKNOWN-PROC":
             self.proc_ptr = typebound_proc(args[8])
 
@@ -669,24 +1016,44 @@ class simd_dec:
 
 @dataclass(init=False)
 class data:
+    __slots__ = (
+        "attr",
+        "comp",
+        "comp_access",
+        "ts",
+        "ns",
+        "common_link",
+        "formal_arg",
+        "parameter",
+        "array_spec",
+        "sym_ref",
+        "sym_ref_cray",
+        "derived",
+        "actual_arg",
+        "nml",
+        "intrinsic",
+        "intrinsic_symbol",
+        "hash",
+        "simd",
+    )
     attr: attribute
-    comp: components = None
-    comp_access: str = ""  # Only for DT's
-    ts: typespec = None
-    ns: namespace = None
-    common_link: symbol_ref = None
-    formal_arg: formal_arglist = None
-    parameter: expression = None  # If parameter
-    array_spec: arrayspec = None
-    sym_ref: symbol_ref = None
-    sym_ref_cray: symbol_ref = None  # If cray_pointer
-    derived: derived_ns = None
-    actual_arg: actual_arglist = None
-    nml: namelist = None
-    intrinsic: int = -1
-    intrinsic_symbol: int = -1
-    hash: int = -1
-    simd: simd_dec = None
+    comp: components
+    comp_access: str  # Only for DT's
+    ts: typespec
+    ns: namespace
+    common_link: symbol_ref
+    formal_arg: formal_arglist
+    parameter: expression  # If parameter
+    array_spec: arrayspec
+    sym_ref: symbol_ref
+    sym_ref_cray: symbol_ref  # If cray_pointer
+    derived: derived_ns
+    actual_arg: actual_arglist
+    nml: namelist
+    intrinsic: int
+    intrinsic_symbol: int
+    hash: int
+    simd: simd_dec
 
     def __init__(self, *args):
         args = list(
@@ -695,26 +1062,29 @@ class data:
         self.attr = attribute(*args[0])
         self.comp = components(*args[1])
 
+        self.comp_access = ""
         if isinstance(args[2], str):
-            self.comp_access = args[2]
+            self.comp_access = _intern(args[2])
             _ = args.pop(2)
 
         self.ts = typespec(*args[2])
         self.ns = namespace(args[3])
         self.common_link = symbol_ref(args[4])
         self.formal_arg = formal_arglist(*args[5])
+        self.parameter = None
         if self.attr.flavor == "PARAMETER":
             self.parameter = expression(*args[6])
             _ = args.pop(6)
         self.array_spec = arrayspec(*args[6])
-        if True:
-            self.sym_ref = symbol_ref(args[7])
-        else:
-            pass  # Ignore cray pointers
+        self.sym_ref_cray = None  # Ignore cray pointers
+        self.sym_ref = symbol_ref(args[7])
         self.derived = derived_ns(*args[8])
         self.actual_arg = actual_arglist(*args[9])
         self.nml = namelist(*args[10])
         self.intrinsic = int(args[11])
+        self.intrinsic_symbol = -1
+        self.hash = -1
+        self.simd = None
         if len(args) > 12:
             self.intrinsic_symbol = int(args[12])
         if len(args) > 13:
@@ -726,14 +1096,15 @@ class data:
 
 @dataclass(init=False)
 class symbol(utils):
-    head: header = None
-    sym: data = None
-    raw: str = ""
+    __slots__ = ("head", "sym", "raw")
+    head: header
+    sym: data
+    raw: t.Any  # Only kept in debug mode
 
     def __init__(self, *args):
         self.head = header(*args[0:5])
         self.sym = data(*args[5])
-        self.raw = args
+        self.raw = args if _DEBUG else None
 
     @property
     def name(self):
@@ -744,41 +1115,89 @@ class symbol(utils):
         return self.head.mn_name
 
 
+# Guards building symbols, shared by all modules as it is rarely contended
+_lazy_lock = threading.Lock()
+
+
+class LazySymbols(collections.abc.Mapping):
+    """
+    Maps symbol id to symbol, only building a symbol the first time
+    it is asked for. At load time we just index the raw slices by id.
+    """
+
+    def __init__(self, data):
+        self._raw = {}
+        self._built = {}
+        for i in range(0, len(data), 6):
+            self._raw[int(data[i])] = data[i : i + 6]
+
+    def __getitem__(self, key):
+        try:
+            return self._built[key]
+        except KeyError:
+            pass
+
+        with _lazy_lock:
+            if key not in self._built:
+                self._built[key] = symbol(*self._raw[key])
+                self._raw[key] = None  # Let the raw slice be freed
+            return self._built[key]
+
+    def __contains__(self, key):
+        return key in self._raw
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __len__(self):
+        return len(self._raw)
+
+    @property
+    def num_built(self):
+        return len(self._built)
+
+
 class module(object):
     version = 15
 
-    def __init__(self, filename, load_only=False):
+    def __init__(self, filename, load_only=False, lazy=False):
         self.filename = filename
+        self.lazy = lazy
 
-        with gzip.open(self.filename) as f:
-            x = f.read().decode()
+        with gzip.open(self.filename, "rt", encoding="utf-8") as f:
+            self.mod_info = f.readline().rstrip("\n")
 
-        self.mod_info = x[: x.index("\n")]
+            v = int(self.mod_info.split("'")[1])
 
-        v = int(self.mod_info.split("'")[1])
+            if v != self.version:
+                raise VersionError("Unsupported module version")
 
-        if v != self.version:
-            raise VersionError("Unsupported module version")
+            parsed_data = parse_sexpr(f)
 
-        data = x[x.index("\n") + 1 :].replace("\n", " ")
+        self._load(parsed_data, load_only)
 
-        self.parsed_data = OneOrMore(nestedExpr()).parseString(data)
+    def _load(self, parsed_data, load_only=False):
+        if load_only or _DEBUG:
+            self.parsed_data = parsed_data
 
         if not load_only:
-            self.interface = self.parsed_data[0]
+            self.interface = parsed_data[0]
 
-            self.operators = self.parsed_data[1]
-            self.generics = self.proc_generics(self.parsed_data[2])
+            self.operators = parsed_data[1]
+            self.generics = self.proc_generics(parsed_data[2])
 
-            self.common = self.proc_common(self.parsed_data[3])
-            self.equivalence = self.parsed_data[4]
+            self.common = self.proc_common(parsed_data[3])
+            self.equivalence = parsed_data[4]
 
-            self.omp = self.parsed_data[5]
+            self.omp = parsed_data[5]
 
-            self.symbols = self.parse_symbols(self.parsed_data[6])
-            self.summary = Summary(self.parsed_data[7])
+            self.symbols = self.parse_symbols(parsed_data[6])
+            self.summary = Summary(parsed_data[7])
 
     def parse_symbols(self, data):
+        if self.lazy:
+            return LazySymbols(data)
+
         result = {}
         for i in range(0, len(data), 6):
             s = symbol(*data[i : i + 6])
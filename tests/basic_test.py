@@ -176,6 +176,186 @@ class TestBasicMethods:
         out, err = capfd.readouterr()
         self.assertEqual(out.strip(), "200")
 
+    def test_sub_opt_missing(self, capfd):
+        y = x.sub_int_opt()
+        out, err = capfd.readouterr()
+        self.assertEqual(out.strip(), "200")
+
+    def test_proc_bad_args(self):
+        with pytest.raises(TypeError):
+            x.func_int_in()
+
+        with pytest.raises(TypeError):
+            x.func_int_in(y=1)
+
+    def test_proc_reuse(self):
+        f = x.func_int_in_multi
+        for i in range(3):
+            y = f(i, z=1, y=2)
+            self.assertEqual(y.result, i + 3)
+            self.assertEqual(y.args, {"x": i, "y": 2, "z": 1})
+
+    def test_cached_attrs(self):
+        self.assertEqual(x.func_int_in is x.func_int_in, True)
+        self.assertEqual(x.const_int, 1)
+        self.assertEqual("const_int" in x.__dict__, True)
+
+        with pytest.raises(AttributeError):
+            x.const_int = 2
+        self.assertEqual(x.const_int, 1)
+
+        with pytest.raises(AttributeError):
+            x.func_int_in = 2
+        self.assertEqual(x.func_int_in(2).result, 4)
+
+    def test_resolve_all(self):
+        y = gf.fFort(SO, MOD).resolve_all()
+        self.assertEqual("sub_no_args" in y.__dict__, True)
+        self.assertEqual("a_int" in y.__dict__, False)
+        y.a_int = 7
+        self.assertEqual(y.a_int, 7)
+        self.assertEqual(y.func_int_in(3).result, 6)
+
+    def test_result(self):
+        y = x.func_intent_out(9, 0)
+        res, args = y
+        self.assertEqual(res, 9)
+        self.assertEqual(y[0], 9)
+        self.assertEqual(len(args), 2)
+        self.assertEqual(args, {"y": 9, "x": 9})
+        self.assertEqual(dict(y.args), {"y": 9, "x": 9})
+
+        # Still the named tuple it has always been
+        self.assertEqual(isinstance(y, tuple), True)
+        self.assertEqual(y._asdict()["result"], 9)
+        self.assertEqual(y._replace(result=1).result, 1)
+
+    def test_drop_intent_in(self):
+        f = x.func_intent_out
+        f.drop_intent_in = True
+        try:
+            y = f(9, 0)
+            self.assertEqual(y.result, 9)
+            self.assertEqual(y.args, {"x": 9})
+        finally:
+            f.drop_intent_in = False
+
+        y = gf.fFort(SO, MOD, drop_intent_in=True).func_int_in(2)
+        self.assertEqual(y.result, 4)
+        self.assertEqual(y.args, {})
+
+    def test_batch(self):
+        v = np.arange(10)
+        y = x.func_int_in.batch(v)
+        np.testing.assert_array_equal(y.result, 2 * v)
+
+        y = x.func_int_in_multi.batch(v, 1, z=v)
+        np.testing.assert_array_equal(y.result, 2 * v + 1)
+
+        y = x.func_int_value.batch(v)
+        np.testing.assert_array_equal(y.result, 2 * v)
+
+        y = x.func_test_bool.batch([1, 0, 1])
+        np.testing.assert_array_equal(y.result, [True, False, True])
+
+    def test_batch_outputs(self):
+        v = np.arange(10)
+        y = x.func_result.batch(y=v)
+        np.testing.assert_array_equal(y.result, 2 * v)
+        np.testing.assert_array_equal(y.args["x"], v)
+
+        y = x.sub_real_inout.batch(v)
+        self.assertEqual(y.result, None)
+        np.testing.assert_array_equal(y.args["x"], 2.0 * v)
+        np.testing.assert_array_equal(v, np.arange(10))
+
+    def test_batch_bad_args(self):
+        with pytest.raises(TypeError):
+            x.func_int_in.batch(1)
+
+        with pytest.raises(ValueError):
+            x.func_int_in_multi.batch([1, 2], [1, 2, 3], 1)
+
+        with pytest.raises(TypeError):
+            x.func_int_in_multi.batch([1, 2], 1)
+
+    def test_map(self):
+        f = x.func_int_in_multi
+        items = [{"x": i, "y": 1, "z": 2} for i in range(50)]
+        items += [(i, 1, 2) for i in range(50, 100)]
+        res = f.map(items, workers=4)
+        self.assertEqual([r.result for r in res], [i + 3 for i in range(100)])
+        self.assertEqual([r.args["x"] for r in res], list(range(100)))
+
+    def test_threads(self):
+        import concurrent.futures
+
+        y = gf.fFort(SO, MOD)
+
+        def call(i):
+            return y.func_intent_out(i, 0)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+            res = list(pool.map(call, range(200)))
+
+        self.assertEqual([r.result for r in res], list(range(200)))
+        self.assertEqual([r.args["x"] for r in res], list(range(200)))
+
+    def test_acall(self):
+        import asyncio
+
+        async def main():
+            f = x.func_intent_out
+            return await asyncio.gather(*(f.acall(i, 0) for i in range(20)))
+
+        res = asyncio.run(main())
+        self.assertEqual([r.result for r in res], list(range(20)))
+        self.assertEqual([r.args["x"] for r in res], list(range(20)))
+
+    def test_actor(self, monkeypatch):
+        import asyncio
+        import concurrent.futures
+        import threading
+
+        y = gf.fFort(SO, MOD, actor=True)
+        threads = set()
+
+        f = y.func_int_in
+        call = f._call
+
+        def record(func_args):
+            threads.add(threading.current_thread().name)
+            return call(func_args)
+
+        monkeypatch.setattr(f, "_call", record)
+
+        async def main():
+            return await asyncio.gather(*(f.acall(i) for i in range(10)))
+
+        res = asyncio.run(main())
+        self.assertEqual([r.result for r in res], [2 * i for i in range(10)])
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as pool:
+            res = list(pool.map(lambda i: f(i), range(10)))
+        self.assertEqual([r.result for r in res], [2 * i for i in range(10)])
+        self.assertEqual(f(3).result, 6)
+
+        self.assertEqual(len(threads), 1)
+        self.assertEqual(threads.pop().startswith("gfort2py-basic.mod"), True)
+
+    def test_view(self):
+        v = x.view("a_int")
+        x.a_int = 3
+        self.assertEqual(int(v), 3)
+        v[()] = 4
+        self.assertEqual(x.a_int, 4)
+
+        with pytest.raises(TypeError):
+            x.view("const_int")
+
+        with pytest.raises(AttributeError):
+            x.view("invalid_var")
+
     def test_second_mod(self):
         y = x.sub_use_mod()
         self.assertEqual(x.test2_x, 1)
@@ -204,6 +384,18 @@ class TestBasicMethods:
         self.assertEqual(y.result, 9)
         self.assertEqual(y.args["x"], 9)
 
+    def test_intent_out_optional(self):
+        y = x.func_intent_out(9)
+        self.assertEqual(y.result, 9)
+        self.assertEqual(y.args, {"y": 9, "x": 9})
+
+        y = x.func_result(y=4)
+        self.assertEqual(y.result, 8)
+        self.assertEqual(y.args["x"], 4)
+
+        with pytest.raises(TypeError):
+            x.func_intent_out(x=1)
+
     def test_func_result(self):
         y = x.func_result(9, 0)
         self.assertEqual(y.result, 18)
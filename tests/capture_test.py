@@ -0,0 +1,69 @@
+# SPDX-License-Identifier: GPL-2.0+
+
+import os, sys
+import ctypes
+import io
+import logging
+
+os.environ["_GFORT2PY_TEST_FLAG"] = "1"
+
+import numpy as np
+import gfort2py as gf
+
+import pytest
+
+SO = "./tests/basic.so"
+MOD = "./tests/basic.mod"
+
+x = gf.fFort(SO, MOD)
+
+
+class TestCaptureMethods:
+    def assertEqual(self, x, y):
+        assert x == y
+
+    def test_callback(self):
+        lines = []
+        with gf.capture_stdout(lines.append):
+            x.sub_int_opt(1)
+            x.sub_int_opt(None)
+
+        self.assertEqual([i.strip() for i in lines], ["100", "200"])
+
+    def test_file(self):
+        f = io.StringIO()
+        with gf.capture_stdout(f):
+            x.sub_no_args()
+
+        self.assertEqual(f.getvalue().strip(), "1")
+
+    def test_logger(self, caplog):
+        logger = logging.getLogger("gfort2py_test")
+        with caplog.at_level(logging.INFO, logger="gfort2py_test"):
+            with gf.capture_stdout(logger):
+                x.sub_no_args()
+
+        self.assertEqual([r.message.strip() for r in caplog.records], ["1"])
+
+    def test_large_output(self):
+        # More than the pipe buffer
+        lines = []
+        with gf.capture_stdout(lines.append, max_line=100):
+            os.write(1, b"a" * 1000 + b"\n" + b"b\n" * 100000)
+
+        self.assertEqual(lines[:10], ["a" * 100] * 10)
+        self.assertEqual(len(lines), 100010)
+
+    def test_target_error(self):
+        def bad(line):
+            raise ValueError(line)
+
+        with pytest.raises(ValueError):
+            with gf.capture_stdout(bad):
+                os.write(1, b"x\n" * 100000)
+
+    def test_fFort_stdout(self):
+        lines = []
+        y = gf.fFort(SO, MOD, stdout=lines.append)
+        y.sub_int_opt(1)
+        self.assertEqual([i.strip() for i in lines], ["100"])
@@ -0,0 +1,102 @@
+# SPDX-License-Identifier: GPL-2.0+
+
+import os, sys
+import ctypes
+import shutil
+
+os.environ["_GFORT2PY_TEST_FLAG"] = "1"
+
+import numpy as np
+import gfort2py as gf
+import gfort2py.compile as gfc
+import gfort2py.module_parse as mp
+
+import pytest
+
+SO = "./tests/basic.so"
+MOD = "./tests/basic.mod"
+
+
+@pytest.fixture
+def binding(tmp_path, monkeypatch):
+    gfc.main([SO, MOD, "-o", str(tmp_path), "-n", "basic_binding"])
+
+    # Importing must not touch the module parser
+    def fail(*args, **kwargs):
+        raise AssertionError("module file was parsed")
+
+    monkeypatch.setattr(mp, "parse_sexpr", fail)
+
+    finder = gfc.install_import_hook(tmp_path)
+    try:
+        import basic_binding
+
+        yield basic_binding
+    finally:
+        sys.meta_path.remove(finder)
+        sys.modules.pop("basic_binding", None)
+
+
+class TestCompileMethods:
+    def assertEqual(self, x, y):
+        assert x == y
+
+    def test_metadata(self, binding):
+        self.assertEqual(binding.LIBRARY, os.path.abspath(SO))
+        self.assertEqual(binding.MOD_FILE, "basic.mod")
+        self.assertEqual(binding.VERSION, gf.__version__)
+
+    def test_parameter(self, binding):
+        self.assertEqual(binding.const_int, 1)
+
+    def test_variable(self, binding):
+        binding.a_int = 5
+        self.assertEqual(binding.a_int, 5)
+        self.assertEqual(binding.fort.a_int, 5)
+
+    def test_procedure(self, binding):
+        y = binding.func_int_in(5)
+        self.assertEqual(y.result, 10)
+
+    def test_not_a_binding(self, tmp_path):
+        (tmp_path / "not_a_binding_mod.py").write_text("x = 1\n")
+        finder = gfc.install_import_hook(tmp_path)
+        try:
+            with pytest.raises(ImportError) as cm:
+                import not_a_binding_mod
+        finally:
+            sys.meta_path.remove(finder)
+
+    def test_other_version(self, tmp_path):
+        filename = gfc.write(os.path.abspath(SO), MOD, tmp_path, "old_binding")
+        with open(filename) as f:
+            src = f.read()
+        with open(filename, "w") as f:
+            f.write(src.replace(f"VERSION = {gf.__version__!r}", "VERSION = '0.0.1'"))
+
+        finder = gfc.install_import_hook(tmp_path)
+        try:
+            with pytest.raises(ImportError) as cm:
+                import old_binding
+            self.assertEqual("regenerate the binding" in str(cm.value), True)
+        finally:
+            sys.meta_path.remove(finder)
+            sys.modules.pop("old_binding", None)
+
+    def test_default_name(self, tmp_path):
+        filename = gfc.write(os.path.abspath(SO), MOD, tmp_path)
+        self.assertEqual(filename, os.path.join(tmp_path, "basic_binding.py"))
+
+    def test_next_to_library(self, tmp_path):
+        # A binding with the same name as a shared library beside it
+        shutil.copy(SO, tmp_path / "basic.so")
+        gfc.main([str(tmp_path / "basic.so"), MOD, "-o", str(tmp_path), "-n", "basic"])
+
+        finder = gfc.install_import_hook(tmp_path)
+        try:
+            import basic
+
+            self.assertEqual(basic.func_int_in(5).result, 10)
+        finally:
+            sys.meta_path.remove(finder)
+            sys.modules.pop("basic", None)
@@ -68,6 +68,32 @@ module dt
     END TYPE s_alloc_array
     
     
+    TYPE s_particle
+        real(dp)          :: x, v
+        integer           :: id
+        logical           :: alive
+        character(len=4)  :: tag
+        real(dp), dimension(3) :: pos
+        real(dp), dimension(2,3) :: rot
+    END TYPE s_particle
+    
+    TYPE(s_particle), dimension(4) :: f_particles
+    
+    TYPE s_item
+        integer           :: a
+        character(len=3)  :: name
+    END TYPE s_item
+    
+    TYPE s_items
+        integer           :: n
+        TYPE(s_item), dimension(3) :: items
+        real(dp)          :: total
+    END TYPE s_items
+    
+    TYPE(s_items) :: f_items
+    TYPE(s_items), dimension(2) :: f_items_arr
+    
+    
     TYPE(s_struct_basic) :: f_struct
     TYPE(s_struct_basic),dimension(2) :: f_struct_exp_1d
     TYPE(s_struct_basic),dimension(2,2) :: f_struct_exp_2d
@@ -285,4 +311,28 @@ module dt
     end function func_return_s_struct_nested_2
 
 
+    subroutine sub_move_particles(p)
+        TYPE(s_particle), dimension(4), intent(inout) :: p
+        
+        p%x = p%x + p%v
+        p%pos(1) = p%x
+        p%rot(1,2) = p%x
+        
+    end subroutine sub_move_particles
+    
+    
+    real(dp) function func_sum_particles()
+        
+        func_sum_particles = sum(f_particles%x, mask=f_particles%alive)
+        
+    end function func_sum_particles
+    
+    
+    real(dp) function func_sum_items()
+        
+        func_sum_items = sum(f_items%items%a) + f_items%total
+        
+    end function func_sum_items
+
+
 end module dt
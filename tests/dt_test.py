@@ -178,3 +178,167 @@ class TestDTMethods:
         self.assertEqual(y.result["a_int"], 123)
         self.assertEqual(y.result["f_nested"]["a_int"], 234)
         self.assertEqual(y.result["f_nested"]["f_struct"]["a_int"], 345)
+
+    def test_resolve_all(self):
+        y = gf.fFort(SO, MOD).resolve_all()
+        self.assertEqual("func_sum_particles" in y.__dict__, True)
+
+        # Compiler generated symbols are skipped, unsupported ones reported
+        self.assertEqual(any(k.startswith("__") for k in y.unresolved), False)
+        self.assertEqual(
+            isinstance(y.unresolved["f_struct_alloc_1d"], NotImplementedError), True
+        )
+        self.assertEqual("f_particles" in y.unresolved, False)
+        self.assertEqual(y.func_sum_particles().result, x.func_sum_particles().result)
+
+    def test_ctype_cache(self, capfd):
+        from gfort2py import ctype_cache
+
+        y = x.sub_f_simple_inout({"x": 5, "y": 3})
+        counts = ctype_cache.counts()
+        for _ in range(3):
+            y = x.sub_f_simple_inout({"x": 5, "y": 3})
+        self.assertEqual(ctype_cache.counts(), counts)
+
+        # Every instance of a derived type shares one ctypes type
+        self.assertEqual(type(x.f_struct_simple.cvalue), y.args["zzz"].ctype())
+        out, err = capfd.readouterr()
+
+    def test_dt_array_component_view(self):
+        y = x.func_set_f_struct()
+
+        v = x.f_struct["b_int_exp_1d"]
+        v[0] = 100
+        self.assertEqual(x.f_struct["b_int_exp_1d"][0], 100)
+
+        with pytest.raises(ValueError) as cm:
+            x.f_struct["b_int_exp_1d"] = np.zeros(3)
+
+    def test_dt_to_dict_update(self, capfd):
+        s = x.f_struct_simple
+        s.update({"x": 3}, y=4)
+        self.assertEqual(s.to_dict(), {"x": 3, "y": 4})
+
+        z = x.sub_f_simple_in(s)
+        out, err = capfd.readouterr()
+        self.assertEqual(out.split(), ["3", "4"])
+
+        with pytest.raises(KeyError) as cm:
+            s.update(z=1)
+
+        y = x.func_set_f_struct()
+        d = x.f_struct.to_dict()
+        self.assertEqual(d["a_int"], 5)
+        self.assertEqual(d["a_str"], "9999999999")
+
+        # A copy, not a view
+        d["b_int_exp_1d"][:] = 0
+        self.assertEqual(x.f_struct["b_int_exp_1d"][0], 9)
+
+        x.f_struct["a_str"] = "abc"
+        self.assertEqual(x.f_struct["a_str"], "abc       ")
+
+    def test_dt_array_component(self):
+        x.f_items.update(n=3, total=0.5)
+        for i in range(3):
+            x.f_items["items"][i].update(a=i + 1, name="ab")
+        self.assertEqual(x.func_sum_items().result, 6.5)
+
+        d = x.f_items.to_dict()
+        self.assertEqual(len(d["items"]), 3)
+        self.assertEqual(d["items"][2], {"a": 3, "name": "ab "})
+        self.assertEqual(d["total"], 0.5)
+
+        # A copy
+        d["items"][0]["a"] = 10
+        self.assertEqual(x.f_items["items"][0]["a"], 1)
+
+    def test_dt_array_component_dtype(self):
+        dtype = x.f_items_arr.dtype
+        self.assertEqual(dtype["items"].shape, (3,))
+        self.assertEqual(dtype["items"].base.names, ("a", "name"))
+        self.assertEqual(dtype.fields["total"][1], ctypes.sizeof(x.f_items.ctype()) - 8)
+        self.assertEqual(dtype.itemsize, ctypes.sizeof(x.f_items.ctype()))
+
+        v = x.view("f_items_arr")
+        v["items"]["a"][1] = [1, 2, 3]
+        v["total"][1] = 2.5
+        self.assertEqual(x.f_items_arr[1]["items"][2]["a"], 3)
+        self.assertEqual(x.f_items_arr[1]["total"], 2.5)
+        self.assertEqual(x.f_items_arr["items"].shape, (2, 3))
+
+        x.f_items_arr["items"] = np.zeros((2, 3), dtype=dtype["items"].base)
+        self.assertEqual(x.f_items_arr[1]["items"][0]["name"], "   ")
+
+    def test_dt_array_structured(self):
+        v = x.view("f_particles")
+        self.assertEqual(v.shape, (4,))
+        self.assertEqual(v.dtype, x.f_particles.dtype)
+
+        v["x"] = [1, 2, 3, 4]
+        v["alive"] = [1, 1, 0, 1]
+        x.f_particles["tag"] = "ab"
+        self.assertEqual(x.func_sum_particles().result, 7.0)
+
+        # Columns and elements see the same memory
+        self.assertEqual(x.f_particles[1]["x"], 2.0)
+        self.assertEqual(x.f_particles[0]["tag"], "ab  ")
+        np.testing.assert_array_equal(v["tag"], [b"ab  "] * 4)
+        np.testing.assert_array_equal(x.f_particles["x"], [1, 2, 3, 4])
+
+        x.f_particles["v"] = 5
+        np.testing.assert_array_equal(v["v"], [5] * 4)
+
+        # Multi-dimensional components are Fortran ordered, except in the view
+        x.f_particles[2]["rot"] = np.arange(6).reshape(2, 3)
+        self.assertEqual(x.f_particles["rot"].shape, (4, 2, 3))
+        np.testing.assert_array_equal(x.f_particles["rot"][2], x.f_particles[2]["rot"])
+        np.testing.assert_array_equal(v["rot"][2], np.arange(6).reshape(2, 3).T)
+
+        with pytest.raises(KeyError) as cm:
+            y = x.f_particles["abc"]
+
+        # Only parts of s_struct_basic can be held by numpy
+        with pytest.raises(TypeError) as cm:
+            y = x.g_struct_exp_1d["c_int_alloc_1d"]
+        self.assertEqual(x.g_struct_exp_1d["a_int"].shape, (2,))
+
+    def test_dt_array_structured_arg(self):
+        p = np.zeros(4, dtype=x.f_particles.dtype)
+        p["x"] = 1
+        p["v"] = [1, 2, 3, 4]
+        p["tag"] = b"ab  "
+
+        # Matches the Fortran layout so is updated in place
+        y = x.sub_move_particles(p)
+        np.testing.assert_array_equal(p["x"], [2, 3, 4, 5])
+        np.testing.assert_array_equal(p["pos"][:, 0], [2, 3, 4, 5])
+        np.testing.assert_array_equal(y.args["p"]["rot"][:, 0, 1], [2, 3, 4, 5])
+
+        # NUL padded CHARACTER components are blank padded in a copy,
+        # the caller's array is left alone
+        p["tag"] = b"ab"
+        y = x.sub_move_particles(p)
+        self.assertEqual(y.args["p"][0]["tag"], "ab  ")
+        np.testing.assert_array_equal(y.args["p"]["x"], [3, 5, 7, 9])
+        np.testing.assert_array_equal(p["tag"], [b"ab"] * 4)
+        np.testing.assert_array_equal(p["x"], [2, 3, 4, 5])
+
+        # Other dtypes and dicts of columns are copied by name
+        q = np.zeros(4, dtype=[("v", "f8"), ("x", "f8")])
+        q["v"] = 2
+        y = x.sub_move_particles(q)
+        np.testing.assert_array_equal(y.args["p"]["x"], [2] * 4)
+
+        np.testing.assert_array_equal(q["x"], [0] * 4)
+
+        q = np.zeros(4, dtype=[("tag", "S4")])
+        q["tag"] = b"cd"
+        y = x.sub_move_particles(q)
+        self.assertEqual(y.args["p"][3]["tag"], "cd  ")
+
+        y = x.sub_move_particles({"x": [1, 2, 3, 4], "v": 1.0})
+        np.testing.assert_array_equal(y.args["p"].view()["x"], [2, 3, 4, 5])
+
+        with pytest.raises(ValueError) as cm:
+            y = x.sub_move_particles(np.zeros(3, dtype=x.f_particles.dtype))
@@ -312,4 +312,43 @@ module dummy_arrays
 	end subroutine sub_check_alloc_int_3d
 
 
+	subroutine sub_assumed_out(x, y)
+		real(dp), dimension(:), intent(out) :: x
+		integer, allocatable, dimension(:), intent(out) :: y
+		
+		x = 3.0_dp
+		allocate(y(4))
+		y = 7
+	
+	end subroutine sub_assumed_out
+
+
+	subroutine sub_assumed_size_double(x, n)
+		real(dp), intent(inout) :: x(*)
+		integer, intent(in) :: n
+		
+		x(1:n) = 2 * x(1:n)
+	
+	end subroutine sub_assumed_size_double
+
+
+	subroutine sub_scale_strided(x)
+		real(dp), dimension(:,:), intent(inout) :: x
+		integer :: i
+		
+		do i=1,size(x,2)
+			x(:,i) = x(:,i) * i
+		end do
+	
+	end subroutine sub_scale_strided
+	
+	
+	real(dp) function func_first_strided(x)
+		real(dp), dimension(:), intent(in) :: x
+		
+		func_first_strided = x(1) + 10 * x(size(x))
+	
+	end function func_first_strided
+
+
 end module dummy_arrays
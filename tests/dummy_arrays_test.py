@@ -41,6 +41,22 @@ class TestDummyArrayMethods:
         v[:] = 1
         np.testing.assert_array_equal(x.c_int_alloc_1d, v)
 
+    def test_c_int_alloc_1d_view(self):
+        y = x.sub_alloc_int_1d_cleanup()
+        self.assertEqual(x.view("c_int_alloc_1d"), None)
+
+        y = x.sub_alloc_int_1d_arrs()
+        v = x.view("c_int_alloc_1d")
+        self.assertEqual(v is x.view("c_int_alloc_1d"), True)
+        np.testing.assert_array_equal(v, np.ones(5))
+        v[:] = 3
+        self.assertEqual(np.sum(x.c_int_alloc_1d), 15)
+
+        y = x.sub_alloc_int_1d_cleanup()
+        self.assertEqual(x.view("c_int_alloc_1d"), None)
+        y = x.sub_alloc_int_1d_arrs()
+        np.testing.assert_array_equal(x.view("c_int_alloc_1d"), np.ones(5))
+
     def test_c_int_alloc_2d(self):
         y = x.sub_alloc_int_1d_cleanup()
         y = x.sub_alloc_int_1d_arrs()
@@ -111,9 +127,7 @@ class TestDummyArrayMethods:
         x.c_int_alloc_5d = v
         np.testing.assert_array_equal(x.c_int_alloc_5d, v)
 
-    @pytest.mark.skip
     def test_c_int_alloc_1d_large(self):
-        # Can have issues exiting when using large (>255) arrays
         y = x.sub_alloc_int_1d_cleanup()
         y = x.sub_alloc_int_1d_arrs()
         v = np.zeros([256], dtype="int32")
@@ -121,6 +135,9 @@ class TestDummyArrayMethods:
         x.c_int_alloc_1d = v
         np.testing.assert_array_equal(x.c_int_alloc_1d, v)
 
+        # Only the malloc'd copy is kept, not a second numpy one
+        self.assertEqual(x._variable("c_int_alloc_1d")._value, None)
+
     def test_c_real_alloc_1d(self):
         y = x.sub_alloc_real_1d_cleanup()
         y = x.sub_alloc_real_1d_arrs()
@@ -406,3 +423,121 @@ class TestDummyArrayMethods:
         )
 
         np.testing.assert_array_equal(y.args["x"], z)
+
+    def test_intent_out(self):
+        y = x.sub_assumed_out(np.zeros(3))
+        np.testing.assert_array_equal(y.args["x"], np.full(3, 3.0))
+        np.testing.assert_array_equal(y.args["y"], np.full(4, 7))
+
+        # The allocatable is allocated by Fortran, what is passed is ignored
+        y = x.sub_assumed_out(np.ones(2), np.ones(10, dtype=np.int32))
+        np.testing.assert_array_equal(y.args["x"], np.full(2, 3.0))
+        np.testing.assert_array_equal(y.args["y"], np.full(4, 7))
+
+        with pytest.raises(TypeError):
+            x.sub_assumed_out()
+
+    def test_assumed_size_no_copy(self):
+        v = np.arange(5.0)
+        y = x.sub_assumed_size_double(v, 5)
+        np.testing.assert_array_equal(v, 2 * np.arange(5.0))
+        np.testing.assert_array_equal(y.args["x"], v)
+
+        # Needs converting so is copied
+        v = np.arange(5)
+        y = x.sub_assumed_size_double(v, 5)
+        np.testing.assert_array_equal(v, np.arange(5))
+        np.testing.assert_array_equal(y.args["x"], 2 * np.arange(5.0))
+
+    def test_assumed_shape_no_copy(self):
+        v = np.zeros(3)
+        y = x.sub_assumed_out(v)
+        np.testing.assert_array_equal(v, np.full(3, 3.0))
+
+        with pytest.raises(ValueError):
+            x.sub_assumed_out(np.zeros((3, 3)))
+
+    def test_strided(self):
+        a = np.arange(100.0).reshape(10, 10)
+        b = a.copy()
+        v = a[::2, 5:9]
+
+        y = x.sub_scale_strided(v)
+        b[::2, 5:9] *= [1, 2, 3, 4]
+        np.testing.assert_array_equal(a, b)
+        np.testing.assert_array_equal(y.args["x"], b[::2, 5:9])
+
+        # C ordered and transposed views
+        v = a.T[1:4, ::3]
+        y = x.sub_scale_strided(v)
+        b.T[1:4, ::3] *= [1, 2, 3, 4]
+        np.testing.assert_array_equal(a, b)
+
+    def test_strided_negative(self):
+        v = np.arange(10.0)
+        y = x.func_first_strided(v[::-3])
+        self.assertEqual(y.result, 9.0 + 10 * 0.0)
+
+        y = x.func_first_strided(v[8:2:-2])
+        self.assertEqual(y.result, 8.0 + 10 * 4.0)
+
+        # Read only views are fine for intent(in)
+        y = x.func_first_strided(np.broadcast_to(np.float64(2), (4,)))
+        self.assertEqual(y.result, 22.0)
+
+    def test_allocate(self):
+        y = x.sub_alloc_int_1d_cleanup()
+        v = x.allocate("c_int_alloc_1d", 5, fill=7)
+        np.testing.assert_array_equal(x.c_int_alloc_1d, [7] * 5)
+
+        # Fortran sees it as allocated and writes into the same memory
+        y = x.sub_alloc_int_1d_arrs()
+        np.testing.assert_array_equal(v, [1] * 5)
+
+        # and can deallocate it
+        y = x.sub_alloc_int_1d_cleanup()
+        self.assertEqual(x.c_int_alloc_1d, None)
+
+        v = x.allocate("c_real_dp_alloc_2d", (3, 4))
+        np.testing.assert_array_equal(x.c_real_dp_alloc_2d, np.zeros((3, 4)))
+
+        with pytest.raises(ValueError):
+            x.allocate("c_int_alloc_1d", (5, 5))
+
+        with pytest.raises(TypeError):
+            x.allocate("sub_alloc_int_1d_arrs", 5)
+
+    def test_adopt(self):
+        y = x.sub_alloc_int_1d_cleanup()
+        self.assertEqual(x.adopt("c_int_alloc_1d"), None)
+
+        y = x.sub_alloc_int_1d_arrs()
+        v = x.adopt("c_int_alloc_1d")
+        self.assertEqual(x.c_int_alloc_1d, None)
+        np.testing.assert_array_equal(v, [1] * 5)
+
+        # Fortran allocates a new array, leaving the adopted one alone
+        y = x.sub_alloc_int_1d_arrs()
+        v[:] = 2
+        np.testing.assert_array_equal(x.c_int_alloc_1d, [1] * 5)
+        y = x.sub_alloc_int_1d_cleanup()
+
+    def test_ctype_cache(self):
+        from gfort2py import ctype_cache
+
+        v = np.arange(10.0)
+        y = x.func_first_strided(v)
+        y = x.sub_scale_strided(v.reshape(2, 5))
+        counts = ctype_cache.counts()
+
+        # Nothing new is built on later calls
+        for _ in range(3):
+            y = x.func_first_strided(v)
+            y = x.sub_scale_strided(v.reshape(2, 5))
+        self.assertEqual(ctype_cache.counts(), counts)
+
+        # Arrays of many different sizes are not all kept
+        for n in range(2, 2002):
+            y = x.func_assumed_size_arr_1d(np.arange(n, dtype=np.int32))
+        self.assertEqual(ctype_cache.counts(), counts)
+        assert ctype_cache._array.cache_info().currsize <= 256
@@ -0,0 +1,60 @@
+# SPDX-License-Identifier: GPL-2.0+
+
+import os, sys
+import ctypes
+
+os.environ["_GFORT2PY_TEST_FLAG"] = "1"
+
+import numpy as np
+import gfort2py as gf
+
+import pytest
+
+SO = "./tests/elemental.so"
+MOD = "./tests/elements.mod"
+
+x = gf.fFort(SO, MOD)
+
+
+class TestElementalMethods:
+    def assertEqual(self, x, y):
+        assert x == y
+
+    def test_ele_func_1_scalar(self):
+        y = x.ele_func_1(2)
+        self.assertEqual(y.result, 4)
+
+    def test_ele_func_1(self):
+        v = np.arange(10)
+        y = x.ele_func_1(v)
+        np.testing.assert_array_equal(y.result, 2 * v)
+
+    def test_ele_func_res(self):
+        v = np.arange(12).reshape(3, 4)
+        y = x.ele_func_res(v)
+        self.assertEqual(y.result.shape, (3, 4))
+        np.testing.assert_array_equal(y.result, 2 * v)
+
+    def test_ele_func_2_broadcast(self):
+        a = np.arange(3).reshape(3, 1)
+        b = np.arange(4)
+        y = x.ele_func_2(a, b)
+        self.assertEqual(y.result.shape, (3, 4))
+        np.testing.assert_array_equal(y.result, 2 * a + 2 * b)
+
+        y = x.ele_func_2([1, 2, 3], y=5)
+        np.testing.assert_array_equal(y.result, [12, 14, 16])
+
+    def test_ele_sub_2(self):
+        v = np.linspace(0, 1, 6).reshape(2, 3)
+        y = x.ele_sub_2(v)
+        self.assertEqual(y.result, None)
+        np.testing.assert_allclose(y.args["y"], 3 * v)
+
+        out = np.zeros(3)
+        y = x.ele_sub_2([1.0, 2.0, 3.0], out)
+        np.testing.assert_allclose(y.args["y"], [3.0, 6.0, 9.0])
+
+    def test_ele_bad_shapes(self):
+        with pytest.raises(ValueError):
+            x.ele_func_2(np.arange(3), np.arange(4))
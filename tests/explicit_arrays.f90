@@ -178,5 +178,18 @@ module explicit_arrays
 	end subroutine check_exp_2d_2m3_nt	
 	
 	
+	subroutine sub_exp_out(x, y)
+		integer, dimension(5), intent(out) :: x
+		real(dp), dimension(2,3), intent(out) :: y
+		integer :: i
+		
+		do i=1,5
+			x(i) = i
+		end do
+		y = 2.0_dp
+		
+	end subroutine sub_exp_out
+	
+	
 
 end module explicit_arrays
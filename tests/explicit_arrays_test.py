@@ -41,11 +41,40 @@ class TestExplicitArrayMethods:
             np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 0.0], dtype="float"),
         )
 
+    def test_const_arr_cached(self):
+        y = x.const_real_dp_arr
+        assert y is x.const_real_dp_arr
+        with pytest.raises(ValueError) as cm:
+            y[0] = 2.0
+
     def test_b_int_exp_1d(self):
         v = np.random.randint(0, 100, size=(5))
         x.b_int_exp_1d = v
         np.testing.assert_array_equal(x.b_int_exp_1d, v)
 
+    def test_b_int_exp_1d_view(self):
+        v = x.view("b_int_exp_1d")
+        self.assertEqual(v is x.view("b_int_exp_1d"), True)
+        x.b_int_exp_1d = np.arange(5)
+        np.testing.assert_array_equal(v, np.arange(5))
+        v[0] = 99
+        self.assertEqual(x.b_int_exp_1d[0], 99)
+
+    def test_batch_inout(self):
+        v = np.arange(15).reshape(3, 5)
+        y = x.sub_exp_inout.batch(v)
+        np.testing.assert_array_equal(y.args["x"], 2 * v)
+
+    def test_batch_2d(self, capfd):
+        v = np.arange(2 * 5 * 5).reshape(2, 5, 5)
+        y = x.sub_exp_array_int_2d.batch(v)
+        out, err = capfd.readouterr()
+        o = [
+            "".join([str(i).zfill(2).ljust(3) for i in r.flatten(order="F")]).strip()
+            for r in v
+        ]
+        self.assertEqual(out.split(), " ".join(o).split())
+
     def test_b_int_exp_2d(self):
         v = np.asfortranarray(np.random.randint(0, 100, size=(5, 5)), dtype="int32")
         x.b_int_exp_2d = v
@@ -279,3 +308,57 @@ class TestExplicitArrayMethods:
         arr_test[0, 3] = 5
 
         np.testing.assert_array_equal(y.args["arr"], arr_test)
+
+    def test_intent_out(self):
+        y = x.sub_exp_out()
+        np.testing.assert_array_equal(y.args["x"], [1, 2, 3, 4, 5])
+        np.testing.assert_array_equal(y.args["y"], np.full((2, 3), 2.0))
+
+        # Values for intent(out) are not copied in, only their shape is checked
+        y = x.sub_exp_out(np.zeros(5), y=np.zeros((2, 3)))
+        np.testing.assert_array_equal(y.args["x"], [1, 2, 3, 4, 5])
+
+        with pytest.raises(ValueError):
+            x.sub_exp_out(np.zeros(4))
+
+    def test_intent_in_not_copied_back(self):
+        v = np.array([1, 2, 3, 4, 5])
+        y = x.sub_exp_array_int_1d(v)
+        self.assertEqual(y.args["x"] is v, True)
+
+    def test_no_copy(self):
+        v = np.arange(5, dtype=np.int32)
+        y = x.sub_exp_inout(v)
+        np.testing.assert_array_equal(v, 2 * np.arange(5))
+        np.testing.assert_array_equal(y.args["x"], v)
+
+        # Wrong type, Fortran works on a copy
+        v = np.arange(5, dtype=np.int64)
+        y = x.sub_exp_inout(v)
+        np.testing.assert_array_equal(v, np.arange(5))
+        np.testing.assert_array_equal(y.args["x"], 2 * np.arange(5))
+
+        # Read only arrays are also copied
+        v = np.arange(5, dtype=np.int32)
+        v.flags.writeable = False
+        y = x.sub_exp_inout(v)
+        np.testing.assert_array_equal(v, np.arange(5))
+        np.testing.assert_array_equal(y.args["x"], 2 * np.arange(5))
+
+    def test_no_copy_2d(self):
+        v = np.zeros((2, 3), order="F")
+        u = np.zeros(5, dtype=np.int32)
+        y = x.sub_exp_out(u, v)
+        np.testing.assert_array_equal(u, [1, 2, 3, 4, 5])
+        np.testing.assert_array_equal(v, np.full((2, 3), 2.0))
+
+        # C ordered, written to a new array
+        v = np.zeros((2, 3))
+        y = x.sub_exp_out(u, v)
+        np.testing.assert_array_equal(v, np.zeros((2, 3)))
+        np.testing.assert_array_equal(y.args["y"], np.full((2, 3), 2.0))
+
+    def test_resolve_all(self):
+        y = gf.fFort(SO, MOD).resolve_all()
+        self.assertEqual(isinstance(y.unresolved["func_mesh_exp"], TypeError), True)
+        self.assertEqual("sub_exp_out" in y.__dict__, True)
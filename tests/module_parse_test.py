@@ -0,0 +1,174 @@
+# SPDX-License-Identifier: GPL-2.0+
+
+import os, sys
+import io
+import gzip
+import glob
+import numpy as np
+
+os.environ["_GFORT2PY_TEST_FLAG"] = "1"
+
+import gfort2py as gf
+from gfort2py.module_parse import parse_sexpr
+
+import pytest
+
+
+class TestModuleParseMethods:
+    def assertEqual(self, x, y):
+        assert x == y
+
+    def test_parse_nested(self):
+        s = "(1 'a' (2 3) ())\n(4)\n"
+        self.assertEqual(
+            parse_sexpr(io.StringIO(s)), [["1", "'a'", ["2", "3"], []], ["4"]]
+        )
+
+    def test_parse_strings(self):
+        s = "('a''b' 'c (d)\ne' \"f\")"
+        self.assertEqual(parse_sexpr(io.StringIO(s)), [["'a''b'", "'c (d) e'", '"f"']])
+
+    def test_parse_small_chunks(self):
+        s = "(1 'a''b' (2\n 3) 'c\nd')\n(4 5)\n"
+        ref = parse_sexpr(io.StringIO(s))
+        for i in range(1, len(s)):
+            self.assertEqual(parse_sexpr(io.StringIO(s), chunk_size=i), ref)
+
+    def test_parse_unbalanced(self):
+        with pytest.raises(ValueError) as cm:
+            parse_sexpr(io.StringIO("(1 (2)"))
+
+        with pytest.raises(ValueError) as cm:
+            parse_sexpr(io.StringIO("(1 2))"))
+
+    @pytest.mark.parametrize("filename", sorted(glob.glob("./tests/*.mod")))
+    def test_parse_matches_pyparsing(self, filename):
+        pp = pytest.importorskip("pyparsing")
+
+        with gzip.open(filename) as f:
+            x = f.read().decode()
+        data = x[x.index("\n") + 1 :].replace("\n", " ")
+        ref = pp.OneOrMore(pp.nestedExpr()).parseString(data).asList()
+
+        with gzip.open(filename, "rt") as f:
+            f.readline()
+            self.assertEqual(parse_sexpr(f, chunk_size=64), ref)
+
+    def test_cache(self, tmp_path, monkeypatch):
+        import gfort2py.module_parse as mp
+
+        mod = gf.mod_info("./tests/basic.mod", cache_dir=str(tmp_path))
+        entries = list(tmp_path.glob("*.pickle"))
+        self.assertEqual(len(entries), 1)
+
+        # Second load must come from the cache without re-parsing
+        def fail(*args, **kwargs):
+            raise AssertionError("module was re-parsed")
+
+        monkeypatch.setattr(mp, "parse_sexpr", fail)
+        mod2 = gf.mod_info("./tests/basic.mod", cache_dir=str(tmp_path))
+        self.assertEqual(sorted(mod2.keys()), sorted(mod.keys()))
+        self.assertEqual(mod2["const_int"].value(), 1)
+
+    def test_cache_env(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("GFORT2PY_CACHE_DIR", str(tmp_path))
+        x = gf.fFort("./tests/basic.so", "./tests/basic.mod")
+        x = gf.fFort("./tests/basic.so", "./tests/basic.mod")
+        self.assertEqual(len(list(tmp_path.glob("*.pickle"))), 1)
+        self.assertEqual(x.const_int, 1)
+
+    def test_cache_corrupt(self, tmp_path):
+        import gfort2py.module_cache as mc
+
+        key = mc.cache_key("./tests/basic.mod")
+        (tmp_path / f"{key}.pickle").write_bytes(b"not a pickle")
+        mod = gf.mod_info("./tests/basic.mod", cache_dir=str(tmp_path))
+        self.assertEqual(mod["const_int"].value(), 1)
+        mod = gf.mod_info("./tests/basic.mod", cache_dir=str(tmp_path))
+        self.assertEqual(mod["const_int"].value(), 1)
+
+    def test_lazy(self):
+        mod = gf.mod_info("./tests/basic.mod", lazy=True)
+        self.assertEqual(mod.symbols.num_built, 0)
+        self.assertEqual(mod["const_int"].value(), 1)
+        self.assertEqual(mod.symbols.num_built, 1)
+        self.assertEqual(mod["const_int"] is mod["const_int"], True)
+
+        eager = gf.mod_info("./tests/basic.mod")
+        self.assertEqual(len(mod.symbols), len(eager.symbols))
+        for key in eager.keys():
+            self.assertEqual(mod[key].head, eager[key].head)
+
+    def test_lazy_fFort(self):
+        x = gf.fFort("./tests/basic.so", "./tests/basic.mod", lazy=True)
+        x.a_int = 5
+        self.assertEqual(x.a_int, 5)
+        self.assertEqual(x.const_int_p1, 2)
+
+    def test_compact_symbols(self):
+        mod = gf.mod_info("./tests/basic.mod")
+        a = mod["a_int"]
+        b = mod["a_int_lp"]
+        self.assertEqual(a.raw, None)
+        self.assertEqual(hasattr(a, "__dict__"), False)
+        self.assertEqual(hasattr(a.sym, "__dict__"), False)
+        self.assertEqual(a.sym.attr.attributes is b.sym.attr.attributes, True)
+        self.assertEqual(a.sym.ts.type is b.sym.ts.type, True)
+        self.assertEqual(hasattr(mod, "parsed_data"), False)
+
+    def test_hextofloat(self):
+        from gfort2py.module_parse import hextofloat
+
+        self.assertEqual(hextofloat("0.12decde@9"), 5065465344.0)
+        self.assertEqual(hextofloat("-0.8@1"), -8.0)
+        self.assertEqual(hextofloat("0.0000000@0"), 0.0)
+        self.assertEqual(hextofloat("0.1@-1"), 1.0 / 256)
+        self.assertEqual(hextofloat("0.4189374bc6a7f0@-2"), 1e-3)
+
+    def test_hextofloat_array(self):
+        from gfort2py.module_parse import hextofloat, hextofloat_array
+
+        s = [
+            "0.12decde@9",
+            "-0.8@1",
+            "-0.00000000000000@0",
+            "0.4189374bc6a7f0@-2",
+            "-0.22d2f39cd48b70@-248",
+            "0.fffffffffffff8@256",
+            "0.40000000000000@-255",
+        ]
+        res = hextofloat_array(s)
+        self.assertEqual(list(res), [hextofloat(i) for i in s])
+        self.assertEqual(np.signbit(res[2]), True)
+
+        # Irregular strings fall back to hextofloat
+        s = ["0.1@1", "0.10000000000000000000000000000@1"]
+        self.assertEqual(list(hextofloat_array(s)), [1.0, 1.0])
+        with pytest.raises(ValueError):
+            hextofloat_array(["0.1@1", "Inf"])
+        self.assertEqual(len(hextofloat_array([])), 0)
+
+    def test_fold_op(self):
+        from gfort2py.module_parse import expression
+
+        ts = ["INTEGER", "4", "0", "0", "0", "INTEGER", []]
+
+        def const(v):
+            return ["CONSTANT", ts, "0", f"'{v}'", []]
+
+        def op(name, *args):
+            if len(args) == 1:
+                return expression("OP", ts, "0", name, args[0], [])
+            return expression("OP", ts, "0", name, *args, [])
+
+        self.assertEqual(op("PLUS", const(7), const(2)).value, 9)
+        self.assertEqual(op("DIVIDE", const(-7), const(2)).value, -3)
+        self.assertEqual(op("DIVIDE", const(7), const(-2)).value, -3)
+        self.assertEqual(op("DIVIDE", const(-7), const(-2)).value, 3)
+        big = 2**62 + 1
+        self.assertEqual(op("DIVIDE", const(big), const(1)).value, big)
+        self.assertEqual(op("DIVIDE", const(1), const(0)).value, None)
+        self.assertEqual(op("UMINUS", const(7)).value, -7)
+        self.assertEqual(op("LT", const(1), const(1)).value, False)
+        var = ["VARIABLE", ts, "0", "7", [], []]
+        self.assertEqual(op("PLUS", var, const(1)).value, None)
@@ -72,6 +72,14 @@ module ptrs
 		d_int_point_1d = 9
 	
 	end subroutine sub_set_ptrs
+	
+	
+	subroutine sub_point_section()
+	
+		d_real_dp_point_1d => e_real_dp_target_1d(1:5:2)
+		d_real_dp_point_2d => e_real_dp_target_2d(5:1:-2, 2:5:2)
+	
+	end subroutine sub_point_section
 
 
 
@@ -82,3 +82,22 @@ class TestPtrsMethods:
         v = "abcdefghij"
         x.a_str_target = v
         self.assertEqual(x.a_str_target, v)
+
+    def test_pointer_section(self):
+        x.e_real_dp_target_1d = np.arange(5.0)
+        x.e_real_dp_target_2d = np.arange(25.0).reshape(5, 5)
+        x.sub_point_section()
+
+        v = x.d_real_dp_point_1d
+        np.testing.assert_array_equal(v, [0.0, 2.0, 4.0])
+
+        # A strided view of the target
+        v = x.view("d_real_dp_point_1d")
+        v[1] = 99.0
+        np.testing.assert_array_equal(x.e_real_dp_target_1d, [0, 1, 99, 3, 4])
+
+        v = x.d_real_dp_point_2d
+        np.testing.assert_array_equal(v, np.arange(25.0).reshape(5, 5)[4::-2, 1::2])
+
+        x.view("d_real_dp_point_2d")[0, 0] = -1
+        self.assertEqual(x.e_real_dp_target_2d[4, 1], -1)
@@ -0,0 +1,42 @@
+! SPDX-License-Identifier: GPL-2.0+
+
+module pool
+
+	implicit none
+	
+	integer, parameter :: dp = selected_real_kind(p=15)
+	
+	integer :: counter = 0
+	
+	contains
+
+	integer function func_add_counter(x)
+		integer, intent(in) :: x
+		
+		counter = counter + x
+		func_add_counter = counter
+	end function func_add_counter
+	
+	subroutine sub_stop()
+		stop 1
+	end subroutine sub_stop
+	
+	subroutine sub_sleep(n)
+		integer, intent(in) :: n
+		
+		call sleep(n)
+	end subroutine sub_sleep
+	
+	real(dp) function func_sum_arr(x)
+		real(dp), dimension(:), intent(in) :: x
+		
+		func_sum_arr = sum(x)
+	end function func_sum_arr
+	
+	subroutine sub_double_arr(x)
+		real(dp), dimension(:), intent(inout) :: x
+		
+		x = 2*x
+	end subroutine sub_double_arr
+
+end module pool
@@ -0,0 +1,93 @@
+# SPDX-License-Identifier: GPL-2.0+
+
+import os, sys
+import ctypes
+
+os.environ["_GFORT2PY_TEST_FLAG"] = "1"
+
+import numpy as np
+import gfort2py as gf
+
+import pytest
+
+SO = "./tests/pool.so"
+MOD = "./tests/pool.mod"
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with gf.fPool(SO, MOD, workers=2, shared_min=1024) as p:
+        yield p
+
+
+class TestPoolMethods:
+    def assertEqual(self, x, y):
+        assert x == y
+
+    def test_call(self, pool):
+        y = pool.call("func_sum_arr", np.ones(10))
+        self.assertEqual(y.result, 10.0)
+
+        y = pool.func_sum_arr(x=np.arange(4.0))
+        self.assertEqual(y.result, 6.0)
+
+    def test_shared_arrays(self, pool):
+        v = np.arange(100000, dtype=float)
+        y = pool.sub_double_arr(v)
+        np.testing.assert_array_equal(y.args["x"], 2 * v)
+        np.testing.assert_array_equal(v, np.arange(100000, dtype=float))
+
+        y = pool.func_sum_arr(v)
+        self.assertEqual(y.result, np.sum(v))
+        # intent(in) arguments are not sent back
+        self.assertEqual(dict(y.args), {})
+
+    def test_state_per_worker(self):
+        with gf.fPool(SO, MOD, workers=1) as p:
+            self.assertEqual(p.func_add_counter(1).result, 1)
+            self.assertEqual(p.func_add_counter(2).result, 3)
+
+    def test_map(self, pool):
+        items = [(np.full(5, i, dtype=float),) for i in range(20)]
+        res = pool.func_sum_arr.map(items)
+        self.assertEqual([r.result for r in res], [5.0 * i for i in range(20)])
+
+    def test_crash(self, pool):
+        with pytest.raises(RuntimeError):
+            pool.sub_stop()
+
+        # Replaced worker still works
+        for i in range(4):
+            self.assertEqual(pool.func_sum_arr(np.ones(3)).result, 3.0)
+
+    def test_timeout(self, pool):
+        f = pool.submit("sub_sleep", (10,), timeout=0.5)
+        with pytest.raises(TimeoutError):
+            f.result()
+
+        self.assertEqual(pool.func_sum_arr(np.ones(3)).result, 3.0)
+
+    def test_shared_memory_error(self, pool, monkeypatch):
+        import gfort2py.executor as ex
+
+        def fail(*args, **kwargs):
+            raise OSError(28, "No space left on device")
+
+        monkeypatch.setattr(ex.shared_memory, "SharedMemory", fail)
+        f = pool.submit("func_sum_arr", (np.ones(1000),))
+        with pytest.raises(OSError):
+            f.result(timeout=30)
+        monkeypatch.undo()
+
+        # The worker is still there
+        self.assertEqual(pool.func_sum_arr(np.ones(1000)).result, 1000.0)
+
+    def test_errors(self, pool):
+        with pytest.raises(AttributeError):
+            pool.counter
+
+        with pytest.raises(AttributeError):
+            pool.submit("invalid_proc")
+
+        with pytest.raises(TypeError):
+            pool.func_sum_arr()
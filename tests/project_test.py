@@ -0,0 +1,70 @@
+# SPDX-License-Identifier: GPL-2.0+
+
+import os, sys
+import ctypes
+
+os.environ["_GFORT2PY_TEST_FLAG"] = "1"
+
+import numpy as np
+import gfort2py as gf
+
+import pytest
+
+SO = "./tests/basic.so"
+MODS = ["./tests/basic.mod", "./tests/basic2.mod"]
+
+
+class TestProjectMethods:
+    def assertEqual(self, x, y):
+        assert x == y
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_load(self, workers):
+        x = gf.fProject(SO, MODS, workers=workers)
+        self.assertEqual(sorted(x.modules.keys()), ["basic", "basic2"])
+        self.assertEqual(x.const_int, 1)
+        self.assertEqual(x.lp2, 4)
+
+    def test_shared_state(self):
+        x = gf.fProject(SO, MODS, workers=2)
+        x.test2_x = 5
+        self.assertEqual(x.basic2.test2_x, 5)
+        self.assertEqual(x.basic.test2_x, 5)
+        x.a_int = 3
+        self.assertEqual(x.basic.a_int, 3)
+
+    def test_procedure(self, capfd):
+        x = gf.fProject(SO, MODS)
+        x.sub_no_args()
+        out, err = capfd.readouterr()
+        self.assertEqual(out.strip(), "1")
+
+    def test_resolve_all(self, capfd):
+        x = gf.fProject(SO, MODS).resolve_all()
+        self.assertEqual(x.sub_no_args is x.basic.sub_no_args, True)
+        x.sub_no_args()
+        out, err = capfd.readouterr()
+        self.assertEqual(out.strip(), "1")
+
+        with pytest.raises(AttributeError):
+            x.const_int = 2
+
+    def test_actor(self):
+        x = gf.fProject(SO, MODS, actor=True)
+        actor = x.basic._proc_options["actor"]
+        self.assertEqual(isinstance(actor, gf.Actor), True)
+        self.assertEqual(x.basic2._proc_options["actor"] is actor, True)
+        self.assertEqual(x.func_int_in(2).result, 4)
+
+    def test_missing(self):
+        x = gf.fProject(SO, MODS)
+        with pytest.raises(AttributeError) as cm:
+            x.invalid_var
+
+    def test_directory(self, tmp_path):
+        import shutil
+
+        for f in MODS:
+            shutil.copy(f, tmp_path)
+        x = gf.fProject(SO, str(tmp_path))
+        self.assertEqual(sorted(x.modules.keys()), ["basic", "basic2"])